@@ -0,0 +1,131 @@
+from typing import Any, Dict, List
+import random
+import sys
+import os
+
+root_path = os.path.dirname(os.path.dirname(__file__))
+if not root_path in sys.path:
+    sys.path.append(root_path)
+
+from common.structures.test_spec import (signal, signal_source,
+        signal_direction, signal_form, step_type, special_step_action)
+
+def generate_dbc_messages_spec(messages: int, signals_per_message: int = 8,
+        seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    rnd = random.Random(seed)
+    ret_val: Dict[str, Dict[str, Any]] = {}
+    length = 64 // signals_per_message
+    for message_index in range(messages):
+        name = f'BenchMsg{message_index}'
+        signals: Dict[str, Dict[str, Any]] = {}
+        for signal_index in range(signals_per_message):
+            signal_name = f'Sig{signal_index}'
+            signals[signal_name] = {'name': signal_name,
+                    'position': signal_index * length, 'length': length,
+                    'factor': 1, 'offset': 0, 'min': 0,
+                    'max': pow(2, length) - 1, 'unit': '',
+                    'description': f'{name} {signal_name}'}
+        ret_val[name] = {'name': name, 'id': 0x100 + message_index,
+                'length': 8, 'description': name, 'message_type': 'PpCcInput',
+                'period_ms': rnd.choice([10, 20, 50, 100]), 'signals': signals}
+    return ret_val
+
+def write_dbc_file(path: str, spec: Dict[str, Dict[str, Any]]) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('VERSION ""\n\nNS_ :\n\nBS_:\n\nBU_: DUT HOST\n\n')
+        for message in spec.values():
+            file.write(f'BO_ {message["id"]} {message["name"]}: ' +
+                    f'{message["length"]} HOST\n')
+            for signal in message['signals'].values():
+                file.write(f' SG_ {signal["name"]} : {signal["position"]}|' +
+                        f'{signal["length"]}@1+ ({signal["factor"]},' +
+                        f'{signal["offset"]}) [{signal["min"]}|' +
+                        f'{signal["max"]}] "{signal["unit"]}" DUT\n')
+            file.write('\n')
+        for message in spec.values():
+            file.write(f'BA_ "GenMsgCycleTime" BO_ {message["id"]} ' +
+                    f'{message["period_ms"]};\n')
+
+def generate_a2l_signals_spec(signals: int) -> Dict[str, Dict[str, str]]:
+    ret_val: Dict[str, Dict[str, str]] = {}
+    for index in range(signals):
+        name = f'BenchCal{index}'
+        ret_val[name] = {'name': name, 'description': name,
+                'address': hex(0x80000000 + index * 4), 'upper_limit': '1000',
+                'lower_limit': '0', 'record_layout': 'RL_FLOAT32_IEEE'}
+    return ret_val
+
+def write_a2l_file(path: str, spec: Dict[str, Dict[str, str]]) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('ASAP2_VERSION 1 61\n/begin PROJECT BENCH ""\n')
+        file.write('  /begin MODULE BENCH ""\n')
+        for signal in spec.values():
+            file.write(f'    /begin CHARACTERISTIC {signal["name"]} ' +
+                    f'"{signal["description"]}"\n      VALUE ' +
+                    f'{signal["address"]} {signal["record_layout"]} 0 ' +
+                    f'NO_COMPU_METHOD {signal["lower_limit"]} ' +
+                    f'{signal["upper_limit"]}\n    /end CHARACTERISTIC\n')
+        file.write('  /end MODULE\n/end PROJECT\n')
+
+def generate_test_spec_signals(dbc_spec: Dict[str, Dict[str, Any]],
+        a2l_spec: Dict[str, Dict[str, str]]) -> Dict[str, signal]:
+    ret_val: Dict[str, signal] = {}
+    for message in dbc_spec.values():
+        for signal_name in message['signals']:
+            ret_val[f'{message["name"]}_{signal_name}'] = signal(
+                    name=signal_name, parent=message['name'],
+                    source_type=signal_source.DBC, source='bench.dbc',
+                    direction=signal_direction.BOTH)
+    for signal_name in a2l_spec:
+        ret_val[f'a2l_{signal_name}'] = signal(name=signal_name, parent='a2l',
+                source_type=signal_source.A2L, source='bench.a2l',
+                direction=signal_direction.INPUT)
+    return ret_val
+
+def generate_test_spec(signals: Dict[str, signal], steps: int,
+        signals_per_step: int = 10, seed: int = 0) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    dbc_names = [name for name in signals
+            if signals[name].source_type == signal_source.DBC]
+    a2l_names = [name for name in signals
+            if signals[name].source_type == signal_source.A2L]
+    used_signals: Dict[str, None] = {}
+    def prepare_step(index: int) -> Dict[str, Any]:
+        if index > 0 and index % 50 == 0:
+            return {'type': step_type.SPECIAL.value, 'action': f'step {index}',
+                    'duration_ms': 10,
+                    'step_action': special_step_action.GET_INFO.value,
+                    'action_details': None, 'monitored_signals': {},
+                    'logged_signals': {}}
+        control = rnd.sample(dbc_names, min(signals_per_step, len(dbc_names)))
+        control += rnd.sample(a2l_names, min(2, len(a2l_names)))
+        monitored = rnd.sample(dbc_names, min(signals_per_step, len(dbc_names)))
+        logged = rnd.sample(dbc_names, min(2, len(dbc_names)))
+        used_signals.update(dict.fromkeys(control + monitored + logged))
+        return {'type': step_type.COMMON.value, 'action': f'step {index}',
+                'duration_ms': 100,
+                'control_signals': {name: {'form': signal_form.CONSTANT.value,
+                        'coef': [rnd.randint(0, 3)]} for name in control},
+                'monitored_signals': {name: {'form': signal_form.LINE.value,
+                        'coef': [0.5, rnd.randint(0, 3)],
+                        'monitored_ranges': [{'start_ms': 10, 'stop_ms': 90,
+                                'tolerance': 5}]} for name in monitored},
+                'logged_signals': {name: {} for name in logged}}
+    initial_state = prepare_step(index=0)
+    return {'name': f'bench spec {steps}', 'dscr': 'synthetic benchmark spec',
+            'xray_id': f'BENCH-{steps}', 'initial_state': initial_state,
+            'steps': [prepare_step(index=index) for index in range(1, steps + 1)],
+            'used_signals': list(used_signals)}
+
+def generate_frames(dbc_spec: Dict[str, Dict[str, Any]],
+        frames: int, seed: int = 0) -> List[List[Any]]:
+    rnd = random.Random(seed)
+    messages = list(dbc_spec.values())
+    ret_val: List[List[Any]] = []
+    for index in range(frames):
+        message = messages[index % len(messages)]
+        ret_val.append([index, '0', hex(message['id']), '',
+                {'message_name': message['name'],
+                        'signals': {name: rnd.randint(0, 3)
+                                for name in message['signals']}}])
+    return ret_val
@@ -0,0 +1,281 @@
+from typing import Any, Callable, Dict, List
+from datetime import datetime
+import subprocess
+import statistics
+import threading
+import argparse
+import platform
+import tempfile
+import time
+import json
+import sys
+import os
+
+root_path = os.path.dirname(os.path.dirname(__file__))
+if not root_path in sys.path:
+    sys.path.append(root_path)
+
+from benchmarks.generators import (generate_dbc_messages_spec, write_dbc_file,
+        generate_a2l_signals_spec, write_a2l_file, generate_test_spec_signals,
+        generate_test_spec, generate_frames)
+from common.structures.test_spec import test_spec
+
+class benchmark_result:
+    def __init__(self, name: str, parameters: Dict[str, Any],
+            samples_s: List[float], operations: int, error: str = None) -> None:
+        self.name: str = name
+        self.parameters: Dict[str, Any] = parameters
+        self.samples_s: List[float] = samples_s
+        self.operations: int = operations
+        self.error: str = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        ret_val: Dict[str, Any] = {}
+        ret_val['name'] = self.name
+        ret_val['parameters'] = self.parameters
+        ret_val['operations'] = self.operations
+        if not self.error is None:
+            ret_val['error'] = self.error
+            return ret_val
+        median_s = statistics.median(self.samples_s)
+        ret_val['samples_s'] = self.samples_s
+        ret_val['min_s'] = min(self.samples_s)
+        ret_val['median_s'] = median_s
+        ret_val['mean_s'] = statistics.mean(self.samples_s)
+        ret_val['ops_per_s'] = self.operations / median_s if median_s > 0 else None
+        return ret_val
+
+def measure(name: str, parameters: Dict[str, Any], operations: int,
+        repeat: int, func: Callable[[], Any],
+        setup: Callable[[], Any] = None) -> benchmark_result:
+    samples_s: List[float] = []
+    try:
+        context = None
+        if not setup is None:
+            context = setup()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(context)
+            samples_s.append(time.perf_counter() - start)
+    except Exception as e:
+        return benchmark_result(name=name, parameters=parameters, samples_s=[],
+                operations=operations, error=f'{type(e).__name__}: {e}')
+    return benchmark_result(name=name, parameters=parameters,
+            samples_s=samples_s, operations=operations)
+
+def bench_prepare_data(dbc_spec: Dict[str, Dict[str, Any]],
+        repeat: int) -> benchmark_result:
+    def setup() -> List[Any]:
+        from common.structures.dbc_file import dbc_message
+        ret_val: List[Any] = []
+        for spec in dbc_spec.values():
+            message = dbc_message.create_from_spec(spec=spec, source='bench.dbc')
+            ret_val.append((message, {name: 1 for name in message.signals}))
+        return ret_val
+    def run(messages: List[Any]) -> None:
+        for message, signals in messages:
+            message.prepare_data(signals=signals)
+    return measure(name='dbc_message.prepare_data',
+            parameters={'messages': len(dbc_spec)}, operations=len(dbc_spec),
+            repeat=repeat, func=run, setup=setup)
+
+def bench_dbc_file(dbc_path: str, dbc_spec: Dict[str, Dict[str, Any]],
+        repeat: int) -> List[benchmark_result]:
+    from common.structures.dbc_file import dbc_file
+    parameters = {'messages': len(dbc_spec)}
+    names = [f'{message["name"]}_{signal}' for message in dbc_spec.values()
+            for signal in message['signals']][::8]
+    def run_find(file: dbc_file) -> None:
+        for name in names:
+            file.find_signal_from_spec(signal_name=name)
+    return [measure(name='dbc_file loading', parameters=parameters,
+                    operations=1, repeat=repeat,
+                    func=lambda context: dbc_file(dbc_file_path=dbc_path)),
+            measure(name='dbc_file.find_signal_from_spec',
+                    parameters={**parameters, 'lookups': len(names)},
+                    operations=len(names), repeat=repeat, func=run_find,
+                    setup=lambda: dbc_file(dbc_file_path=dbc_path))]
+
+def bench_a2l_file(a2l_path: str, signals: int,
+        repeat: int) -> benchmark_result:
+    from common.structures.a2l_file import a2l_file
+    return measure(name='a2l_file loading', parameters={'signals': signals},
+            operations=1, repeat=repeat,
+            func=lambda context: a2l_file(a2l_file_path=a2l_path))
+
+def bench_test_spec(spec_json: Dict[str, Any], signals: Dict[str, Any],
+        repeat: int) -> List[benchmark_result]:
+    parameters = {'steps': len(spec_json['steps'])}
+    return [measure(name='test_spec.create_from_spec', parameters=parameters,
+                    operations=len(spec_json['steps']), repeat=repeat,
+                    func=lambda context: test_spec.create_from_spec(
+                            spec=spec_json, signals=signals)),
+            measure(name='test_spec.to_json', parameters=parameters,
+                    operations=len(spec_json['steps']), repeat=repeat,
+                    func=lambda spec: spec.to_json(),
+                    setup=lambda: test_spec.create_from_spec(spec=spec_json,
+                            signals=signals)),
+            measure(name='test_spec.to_json compact', parameters=parameters,
+                    operations=len(spec_json['steps']), repeat=repeat,
+                    func=lambda spec: spec.to_json(compact=True),
+                    setup=lambda: test_spec.create_from_spec(spec=spec_json,
+                            signals=signals))]
+
+def bench_process_message(spec_json: Dict[str, Any], signals: Dict[str, Any],
+        frames: List[List[Any]], repeat: int) -> benchmark_result:
+    def setup() -> Any:
+        import test_spec_runner
+        return test_spec_runner, test_spec.create_from_spec(spec=spec_json, 
+                signals=signals)
+    def run(context: Any) -> None:
+        runner, spec = context
+        step_timestamp_ns = time.monotonic_ns()
+        for frame in frames:
+            runner.process_message(step=spec.initial_state, message=frame,
+                    step_timestamp_ns=step_timestamp_ns)
+        while not runner.faults_queue.empty():
+            runner.faults_queue.get()
+    return measure(name='process_message', parameters={'frames': len(frames)},
+            operations=len(frames), repeat=repeat, func=run, setup=setup)
+
+def bench_monitoring_thread(spec_json: Dict[str, Any],
+        signals: Dict[str, Any], frames: List[List[Any]], batch_size: int,
+        repeat: int) -> benchmark_result:
+    def setup() -> Any:
+        import test_spec_runner
+        return test_spec_runner, test_spec.create_from_spec(spec=spec_json, 
+                signals=signals)
+    def run(context: Any) -> None:
+        from common.tools.runtime_metrics import runtime_metrics
+        runner, spec = context
+        with tempfile.TemporaryDirectory() as log_path:
+            runner.metrics = runtime_metrics(
+                    file_path=os.path.join(log_path, 'bench.metrics.jsonl'))
+            thread = threading.Thread(target=runner.monitoring_thread_handle,
+                    args=[spec, log_path])
+            runner.monitoring_start_event.set()
+            thread.start()
+            for index in range(0, len(frames), batch_size):
+                runner.read_feedbacks(frames[index:index + batch_size])
+            while runner.metrics.frames_total < len(frames):
+                time.sleep(0.0001)
+            runner.finish_event.set()
+            thread.join()
+            runner.finish_event.clear()
+            runner.monitoring_start_event.clear()
+            runner.metrics = None
+        while not runner.faults_queue.empty():
+            runner.faults_queue.get()
+    return measure(name='monitoring_thread_handle',
+            parameters={'frames': len(frames), 'batch_size': batch_size},
+            operations=len(frames), repeat=repeat, func=run, setup=setup)
+
+def prepare_metadata() -> Dict[str, Any]:
+    commit = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root_path,
+                capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        pass
+    return {'timestamp': datetime.now().isoformat(), 'commit': commit,
+            'python': platform.python_version(), 'platform': platform.platform()}
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> str:
+    baseline_results = {(r['name'], json.dumps(r['parameters'], sort_keys=True)):
+            r for r in baseline['results']}
+    ret_val = ''
+    for result in current['results']:
+        key = (result['name'], json.dumps(result['parameters'], sort_keys=True))
+        if not key in baseline_results or 'error' in result:
+            continue
+        previous = baseline_results[key]
+        if 'error' in previous:
+            continue
+        ratio = result['median_s'] / previous['median_s']
+        ret_val += f'{result["name"]} {result["parameters"]}: {ratio:.3f}x\n'
+    return ret_val
+
+def bench_signal_table(breakpoints: int, timestamps: int,
+        repeat: int) -> List[benchmark_result]:
+    def setup() -> Any:
+        from common.structures.signal_table import signal_table
+        table = signal_table(times_ms=[float(index * 10)
+                for index in range(breakpoints)],
+                values=[float(index % 100) for index in range(breakpoints)])
+        step_ms = breakpoints * 10 / timestamps
+        return table, [index * step_ms for index in range(timestamps)]
+    def run_interpolate(context: Any) -> None:
+        table, timestamps_ms = context
+        for timestamp_ms in timestamps_ms:
+            table.interpolate(timestamp_ms=timestamp_ms)
+    def run_interpolate_many(context: Any) -> None:
+        table, timestamps_ms = context
+        table.interpolate_many(timestamps_ms=timestamps_ms)
+    parameters = {'breakpoints': breakpoints, 'timestamps': timestamps}
+    return [measure(name='signal_table.interpolate', parameters=parameters,
+                    operations=timestamps, repeat=repeat,
+                    func=run_interpolate, setup=setup),
+            measure(name='signal_table.interpolate_many',
+                    parameters=parameters, operations=timestamps,
+                    repeat=repeat, func=run_interpolate_many, setup=setup)]
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    dbc_spec = generate_dbc_messages_spec(messages=args.messages)
+    a2l_spec = generate_a2l_signals_spec(signals=args.a2l_signals)
+    signals = generate_test_spec_signals(dbc_spec=dbc_spec, a2l_spec=a2l_spec)
+    spec_json = generate_test_spec(signals=signals, steps=args.steps)
+    frames = generate_frames(dbc_spec=dbc_spec, frames=args.frames)
+    results: List[benchmark_result] = []
+    with tempfile.TemporaryDirectory() as work_path:
+        dbc_path = os.path.join(work_path, 'bench.dbc')
+        a2l_path = os.path.join(work_path, 'bench.a2l')
+        write_dbc_file(path=dbc_path, spec=dbc_spec)
+        write_a2l_file(path=a2l_path, spec=a2l_spec)
+        results.append(bench_prepare_data(dbc_spec=dbc_spec,
+                repeat=args.repeat))
+        try:
+            results += bench_dbc_file(dbc_path=dbc_path, dbc_spec=dbc_spec,
+                    repeat=args.repeat)
+        except Exception as e:
+            results.append(benchmark_result(name='dbc_file', parameters={},
+                    samples_s=[], operations=0, error=f'{type(e).__name__}: {e}'))
+        try:
+            results.append(bench_a2l_file(a2l_path=a2l_path,
+                    signals=args.a2l_signals, repeat=args.repeat))
+        except Exception as e:
+            results.append(benchmark_result(name='a2l_file', parameters={},
+                    samples_s=[], operations=0, error=f'{type(e).__name__}: {e}'))
+    results += bench_test_spec(spec_json=spec_json, signals=signals,
+            repeat=args.repeat)
+    results.append(bench_process_message(spec_json=spec_json, signals=signals,
+            frames=frames, repeat=args.repeat))
+    results.append(bench_monitoring_thread(spec_json=spec_json,
+            signals=signals, frames=frames, batch_size=args.batch_size,
+            repeat=args.repeat))
+    results += bench_signal_table(breakpoints=args.steps * 10,
+            timestamps=args.frames, repeat=args.repeat)
+    return {'meta': prepare_metadata(),
+            'results': [result.to_dict() for result in results]}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+            description='Benchmarks of the PIL framework hot paths')
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--a2l_signals', type=int, default=20000)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--frames', type=int, default=100000)
+    parser.add_argument('--batch_size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', type=str, default=None)
+    parser.add_argument('--compare', type=str, default=None)
+    args = parser.parse_args()
+    report = run_benchmarks(args=args)
+    output = json.dumps(report, indent=4)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output)
+    if not args.compare is None:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            print(compare_results(current=report, baseline=json.loads(file.read())))
@@ -0,0 +1,422 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Union
+from enum import Enum
+import threading
+import hashlib
+import asyncio
+import random
+import time
+import sys
+import os
+
+root_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+if not root_path in sys.path:
+    sys.path.append(root_path)
+
+from common.structures.dbc_file import dbc_file, dbc_message
+
+class sim_adapter_type(Enum):
+    SIM = 'SIM'
+
+class sim_fault_type(Enum):
+    NOT_DEFINED = 0
+    DROP_FRAME = 1
+    STUCK_SIGNAL = 2
+    NOISE = 3
+    DELAY = 4
+
+class sim_fault:
+    def __init__(self, fault_type: sim_fault_type, message: str = None,
+            signal: str = None, probability: float = 1.0,
+            value: float = 0.0) -> None:
+        self.fault_type: sim_fault_type = fault_type
+        self.message: str = message
+        self.signal: str = signal
+        self.probability: float = probability
+        self.value: float = value
+
+    @staticmethod
+    def create_from_spec(spec: Dict[str, Any]) -> sim_fault:
+        return sim_fault(fault_type=sim_fault_type(spec['fault_type']),
+                message=spec.get('message'), signal=spec.get('signal'),
+                probability=spec.get('probability', 1.0),
+                value=spec.get('value', 0.0))
+
+class sim_sending_task:
+    def __init__(self, id: str, message: str, can: str, da: str,
+            signals: Dict[str, float], data: str, period_ms: float) -> None:
+        self.id: str = id
+        self.message: str = message
+        self.can: str = can
+        self.da: str = da
+        self.signals: Dict[str, float] = signals
+        self.data: str = data
+        self.period_ms: float = period_ms
+        self.next_frame_ns: int = 0
+
+class sim_dut_info:
+    def __init__(self, serial_number: str, can: str, j1939_sa: str,
+            firmware_version: str) -> None:
+        self.serial_number: str = serial_number
+        self.can: str = can
+        self.j1939_sa: str = j1939_sa
+        self.firmware_version: str = firmware_version
+
+    def print(self) -> str:
+        return (f'serial number: {self.serial_number}; can: {self.can}; ' +
+                f'SA: {self.j1939_sa}; firmware: {self.firmware_version}')
+
+class sim_adapter:
+    def __init__(self, frame_rate: float = 1000.0, can: str = '0',
+            round_trip_ms: float = 0.0, encode_frames: bool = False,
+            seed: int = None) -> None:
+        self.frame_rate: float = frame_rate
+        self.can: str = can
+        self.round_trip_ms: float = round_trip_ms
+        self.encode_frames: bool = encode_frames
+        self.dbc_messages: Dict[str, dbc_message] = {}
+        self.signal_behaviors: Dict[str, Callable[[float], float]] = {}
+        self.faults: List[sim_fault] = []
+        self.sending_tasks: Dict[str, sim_sending_task] = {}
+        self.sent_frames: int = 0
+        self.__random: random.Random = random.Random(seed)
+        self.__tasks_lock: threading.Lock = threading.Lock()
+        self.__tasks_cntr: int = 0
+        self.__callback: Callable[[list], None] = None
+        self.__interval_ms: float = 100
+        self.__messages: List[str] = []
+        self.__reading_thread: threading.Thread = None
+        self.__stop_event: threading.Event = threading.Event()
+        self.__start_ns: int = time.monotonic_ns()
+
+    @staticmethod
+    def create_from_spec(spec: Dict[str, Any]) -> sim_adapter:
+        ret_val = sim_adapter(frame_rate=spec.get('frame_rate', 1000.0),
+                can=spec.get('can', '0'),
+                round_trip_ms=spec.get('round_trip_ms', 0.0),
+                encode_frames=spec.get('encode_frames', False),
+                seed=spec.get('seed'))
+        signals: Dict[str, float] = spec.get('signals', {})
+        for signal_name in signals:
+            ret_val.set_signal_behavior(signal_name=signal_name,
+                    behavior=signals[signal_name])
+        for fault_spec in spec.get('faults', []):
+            ret_val.inject_fault(fault=sim_fault.create_from_spec(spec=fault_spec))
+        return ret_val
+
+    async def __aenter__(self) -> sim_adapter:
+        await self.wait_round_trip()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop_read_can_messages()
+
+    async def wait_round_trip(self) -> None:
+        if self.round_trip_ms > 0:
+            await asyncio.sleep(self.round_trip_ms / 1000)
+
+    def load_dbc_messages(self, messages: Dict[str, dbc_message]) -> None:
+        self.dbc_messages = {**self.dbc_messages, **messages}
+
+    def set_signal_behavior(self, signal_name: str,
+            behavior: Union[float, Callable[[float], float]]) -> None:
+        if callable(behavior):
+            self.signal_behaviors[signal_name] = behavior
+        else:
+            self.signal_behaviors[signal_name] = lambda timestamp_ms: behavior
+
+    def inject_fault(self, fault: sim_fault) -> None:
+        self.faults.append(fault)
+
+    def clear_faults(self) -> None:
+        self.faults = []
+
+    async def upload_dbc(self, dbc_path: str) -> None:
+        await self.wait_round_trip()
+        file = dbc_file(dbc_file_path=dbc_path)
+        self.load_dbc_messages(messages=file.dbc_messages)
+
+    async def start_read_can_messages(self, callback: Callable[[list], None],
+            interval_ms: float, filters: List[Dict[str, Any]] = None,
+            dbc_to_can: Any = None) -> None:
+        await self.stop_read_can_messages()
+        await self.wait_round_trip()
+        self.__callback = callback
+        self.__interval_ms = interval_ms
+        self.__messages = list(self.dbc_messages)
+        if not filters is None:
+            self.__messages = [f['message'] for f in filters
+                    if f['message'] in self.dbc_messages]
+        self.__stop_event.clear()
+        self.__reading_thread = threading.Thread(
+                target=self.__reading_thread_handle, daemon=True)
+        self.__reading_thread.start()
+
+    async def stop_read_can_messages(self) -> None:
+        if self.__reading_thread is None:
+            return
+        self.__stop_event.set()
+        self.__reading_thread.join()
+        self.__reading_thread = None
+
+    async def get_sending_tasks(self) -> List[Dict[str, str]]:
+        await self.wait_round_trip()
+        with self.__tasks_lock:
+            return [{'id': task.id, 'message': task.message, 'can': task.can,
+                    'da': task.da} for task in self.sending_tasks.values()]
+
+    async def stop_sending_tasks(self, sending_tasks_ids: List[str]) -> None:
+        await self.wait_round_trip()
+        with self.__tasks_lock:
+            for id in sending_tasks_ids:
+                self.sending_tasks.pop(id, None)
+
+    def put_sending_task(self, message: dbc_message, can: str, da: str,
+            signals: Dict[str, float]) -> str:
+        data = None
+        if self.encode_frames:
+            data = message.prepare_data(signals=signals)
+        with self.__tasks_lock:
+            self.__tasks_cntr += 1
+            id = str(self.__tasks_cntr)
+            period_ms = message.period_ms
+            if period_ms is None:
+                period_ms = 100
+            self.sending_tasks[id] = sim_sending_task(id=id,
+                    message=message.name, can=can, da=da, signals=signals,
+                    data=data, period_ms=float(period_ms))
+            return id
+
+    def __generate_signals(self, message: dbc_message,
+            timestamp_ms: float) -> Dict[str, float]:
+        ret_val: Dict[str, float] = {}
+        for signal in message.signals:
+            behavior = self.signal_behaviors.get(f'{message.name}_{signal}')
+            if behavior is None:
+                ret_val[signal] = 0.0
+            else:
+                ret_val[signal] = behavior(timestamp_ms)
+        return ret_val
+
+    def __prepare_frame(self, message: dbc_message, signals: Dict[str, float],
+            timestamp_ms: float, data: str = None) -> List[Any]:
+        if data is None:
+            data = ''
+            if self.encode_frames:
+                try:
+                    data = message.prepare_data(signals=signals)
+                except Exception:
+                    pass
+        return [timestamp_ms, self.can, message.id, data,
+                {'message_name': message.name, 'signals': signals}]
+
+    def __apply_faults(self, frames: List[List[Any]]) -> List[List[Any]]:
+        if len(self.faults) == 0:
+            return frames
+        ret_val: List[List[Any]] = []
+        for frame in frames:
+            dropped = False
+            for fault in self.faults:
+                if (not fault.message is None and
+                        fault.message != frame[4]['message_name']):
+                    continue
+                if self.__random.random() >= fault.probability:
+                    continue
+                signals = frame[4]['signals']
+                if fault.fault_type == sim_fault_type.DROP_FRAME:
+                    dropped = True
+                elif fault.fault_type == sim_fault_type.STUCK_SIGNAL:
+                    if fault.signal in signals:
+                        signals[fault.signal] = fault.value
+                elif fault.fault_type == sim_fault_type.NOISE:
+                    for signal in signals:
+                        if fault.signal is None or fault.signal == signal:
+                            signals[signal] += self.__random.uniform(
+                                    -fault.value, fault.value)
+            if not dropped:
+                ret_val.append(frame)
+        return ret_val
+
+    def __delay_ms(self) -> float:
+        ret_val = 0.0
+        for fault in self.faults:
+            if (fault.fault_type == sim_fault_type.DELAY and
+                    self.__random.random() < fault.probability):
+                ret_val = max(ret_val, fault.value)
+        return ret_val
+
+    def __reading_thread_handle(self) -> None:
+        last_ns = time.monotonic_ns()
+        message_index = 0
+        pending_frames = 0.0
+        while not self.__stop_event.wait(self.__interval_ms / 1000):
+            now_ns = time.monotonic_ns()
+            timestamp_ms = (now_ns - self.__start_ns) / 1000000
+            frames: List[List[Any]] = []
+            if len(self.__messages) > 0:
+                pending_frames += self.frame_rate * (now_ns - last_ns) / 1000000000
+                for _ in range(int(pending_frames)):
+                    message = self.dbc_messages[self.__messages[message_index]]
+                    message_index = (message_index + 1) % len(self.__messages)
+                    frames.append(self.__prepare_frame(message=message,
+                            signals=self.__generate_signals(message=message,
+                                    timestamp_ms=timestamp_ms),
+                            timestamp_ms=timestamp_ms))
+                pending_frames -= int(pending_frames)
+            last_ns = now_ns
+            with self.__tasks_lock:
+                for task in self.sending_tasks.values():
+                    if task.next_frame_ns > now_ns:
+                        continue
+                    task.next_frame_ns = now_ns + int(task.period_ms * 1000000)
+                    self.sent_frames += 1
+                    if not task.message in self.__messages:
+                        continue
+                    frames.append(self.__prepare_frame(
+                            message=self.dbc_messages[task.message],
+                            signals=dict(task.signals),
+                            timestamp_ms=timestamp_ms, data=task.data))
+            frames = self.__apply_faults(frames=frames)
+            delay_ms = self.__delay_ms()
+            if delay_ms > 0:
+                time.sleep(delay_ms / 1000)
+            if len(frames) > 0 and not self.__callback is None:
+                self.__callback(frames)
+
+class sim_dut_adapter:
+    def __init__(self, serial_number: str, adapter: sim_adapter,
+            j1939_sa: str = '00', firmware_version: str = 'sim',
+            reboot_ms: float = 0.0, parameters: Dict[str, Any] = None,
+            fram_size: int = 0x10000, report_size: int = 0x1000,
+            firmware_failure_rate: float = 0.0, seed: int = None) -> None:
+        self.serial_number: str = serial_number
+        self.adapter: sim_adapter = adapter
+        self.dut_info: sim_dut_info = sim_dut_info(serial_number=serial_number,
+                can=adapter.can, j1939_sa=j1939_sa,
+                firmware_version=firmware_version)
+        self.reboot_ms: float = reboot_ms
+        self.parameters: Dict[str, Any] = {}
+        if not parameters is None:
+            self.parameters = dict(parameters)
+        self.calibrations: Dict[str, float] = {}
+        self.fram: bytearray = bytearray(fram_size)
+        self.powered: bool = True
+        self.firmware_failure_rate: float = firmware_failure_rate
+        self.firmware_image: bytearray = None
+        self.__random: random.Random = random.Random(seed)
+        self.report: bytes = bytes(self.__random.getrandbits(8)
+                for _ in range(report_size))
+
+    @staticmethod
+    def create_from_spec(serial_number: str, adapter: sim_adapter,
+            spec: Dict[str, Any]) -> sim_dut_adapter:
+        return sim_dut_adapter(serial_number=serial_number, adapter=adapter,
+                j1939_sa=spec.get('j1939_sa', '00'),
+                firmware_version=spec.get('firmware_version', 'sim'),
+                reboot_ms=spec.get('reboot_ms', 0.0),
+                parameters=spec.get('parameters'),
+                fram_size=spec.get('fram_size', 0x10000),
+                report_size=spec.get('report_size', 0x1000),
+                firmware_failure_rate=spec.get('firmware_failure_rate', 0.0),
+                seed=spec.get('seed'))
+
+    async def __aenter__(self) -> sim_dut_adapter:
+        await self.adapter.wait_round_trip()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def set_connection(self) -> None:
+        await self.adapter.wait_round_trip()
+
+    async def reboot(self) -> None:
+        await self.adapter.wait_round_trip()
+        if self.reboot_ms > 0:
+            await asyncio.sleep(self.reboot_ms / 1000)
+        self.calibrations = {}
+        self.powered = True
+
+    async def power_off(self) -> None:
+        await self.adapter.wait_round_trip()
+        self.powered = False
+
+    async def power_on(self) -> None:
+        await self.adapter.wait_round_trip()
+        self.powered = True
+
+    async def get_parameters(self) -> Dict[str, Any]:
+        await self.adapter.wait_round_trip()
+        return dict(self.parameters)
+
+    async def update_parameters(self, parameters: Dict[str, Any]) -> None:
+        await self.adapter.wait_round_trip()
+        self.parameters = {**self.parameters, **parameters}
+
+    async def read_fram(self) -> bytes:
+        await self.adapter.wait_round_trip()
+        return bytes(self.fram)
+
+    async def get_fram_size(self) -> int:
+        await self.adapter.wait_round_trip()
+        return len(self.fram)
+
+    async def read_fram_block(self, offset: int, size: int) -> bytes:
+        await self.adapter.wait_round_trip()
+        return bytes(self.fram[offset:offset + size])
+
+    async def get_report(self) -> bytes:
+        await self.adapter.wait_round_trip()
+        return self.report
+
+    async def get_report_size(self) -> int:
+        await self.adapter.wait_round_trip()
+        return len(self.report)
+
+    async def read_report_block(self, offset: int, size: int) -> bytes:
+        await self.adapter.wait_round_trip()
+        return self.report[offset:offset + size]
+
+    async def start_firmware_update(self, size: int, block_size: int) -> None:
+        await self.adapter.wait_round_trip()
+        self.firmware_image = bytearray(size)
+
+    async def write_firmware_block(self, offset: int, data: bytes) -> bool:
+        await self.adapter.wait_round_trip()
+        if self.firmware_image is None:
+            raise Exception('Firmware update is not started')
+        if self.__random.random() < self.firmware_failure_rate:
+            return False
+        self.firmware_image[offset:offset + len(data)] = data
+        return True
+
+    async def finish_firmware_update(self, sha256: str) -> None:
+        await self.adapter.wait_round_trip()
+        if self.firmware_image is None:
+            raise Exception('Firmware update is not started')
+        if hashlib.sha256(self.firmware_image).hexdigest() != sha256:
+            self.firmware_image = None
+            raise Exception('Firmware image checksum mismatch')
+        self.firmware_image = None
+        self.dut_info.firmware_version = sha256[:8]
+        await self.reboot()
+
+    async def calibrate_signal(self, definition: Any, value: float) -> None:
+        await self.adapter.wait_round_trip()
+        self.calibrations[definition.name] = value
+
+    async def start_sending_task(self, task: Any, signals: Dict[str, float],
+            e2e_protection: bool = False) -> str:
+        await self.adapter.wait_round_trip()
+        return self.adapter.put_sending_task(message=task.message, can=task.can,
+                da=task.da, signals=signals)
+
+    async def stop_sending_tasks(self, ids: List[str]) -> None:
+        await self.adapter.stop_sending_tasks(sending_tasks_ids=ids)
+
+    def prepare_reading_filter(self, dbc_files: List[str]
+            ) -> List[Dict[str, Any]]:
+        return [{'message': message} for message in self.adapter.dbc_messages]
+
+    def prepare_dbc_to_can_map(self, dbc_files: List[str]) -> Dict[str, str]:
+        return {dbc_path: self.adapter.can for dbc_path in dbc_files}
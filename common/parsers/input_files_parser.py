@@ -0,0 +1,87 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future
+import traceback
+import time
+import sys
+import os
+
+root_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+if not root_path in sys.path:
+    sys.path.append(root_path)
+
+from common.structures.a2l_file import a2l_file
+from common.structures.dbc_file import dbc_file
+
+class input_file_error:
+    def __init__(self, file_path: str, error: str, details: str) -> None:
+        self.file_path: str = file_path
+        self.error: str = error
+        self.details: str = details
+
+    def print(self) -> str:
+        return f'{self.file_path}: {self.error}'
+
+class input_files_parser:
+    def __init__(self, workers: int = None) -> None:
+        self.workers: int = workers
+        self.durations_s: Dict[str, float] = {}
+        self.errors: List[input_file_error] = []
+
+    @staticmethod
+    def parse_a2l_file(file_path: str) -> Tuple[a2l_file, float]:
+        start = time.perf_counter()
+        ret_val = a2l_file(a2l_file_path=file_path)
+        return ret_val, time.perf_counter() - start
+
+    @staticmethod
+    def parse_dbc_file(file_path: str) -> Tuple[dbc_file, float]:
+        start = time.perf_counter()
+        ret_val = dbc_file(dbc_file_path=file_path)
+        return ret_val, time.perf_counter() - start
+
+    def __define_workers(self, files: int) -> int:
+        if not self.workers is None:
+            return max(1, min(self.workers, files))
+        return max(1, min(os.cpu_count() or 1, files))
+
+    def __collect(self, file_path: str, result: Callable[[], Tuple[Any, float]]
+            ) -> Any:
+        try:
+            ret_val, duration_s = result()
+        except Exception as e:
+            self.errors.append(input_file_error(file_path=file_path,
+                    error=f'{type(e).__name__}: {e}',
+                    details=traceback.format_exc()))
+            return None
+        self.durations_s[file_path] = duration_s
+        return ret_val
+
+    def parse(self, a2l_path: str, dbc_paths: List[str]
+            ) -> Tuple[a2l_file, List[dbc_file]]:
+        self.durations_s = {}
+        self.errors = []
+        jobs: List[Tuple[str, Callable[[str], Tuple[Any, float]]]] = \
+                [(a2l_path, input_files_parser.parse_a2l_file)]
+        jobs += [(dbc_path, input_files_parser.parse_dbc_file)
+                for dbc_path in dbc_paths]
+        results: List[Any] = []
+        workers = self.__define_workers(files=len(jobs))
+        if workers == 1:
+            for file_path, parse in jobs:
+                results.append(self.__collect(file_path=file_path,
+                        result=lambda: parse(file_path)))
+        else:
+            # threads, not processes: the parser runs inside the runner after
+            # its threads are started, where fork is unsafe and spawn needs
+            # a main guard in every entry script
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures: List[Future] = [executor.submit(parse, file_path)
+                        for file_path, parse in jobs]
+                for (file_path, _), future in zip(jobs, futures):
+                    results.append(self.__collect(file_path=file_path,
+                            result=future.result))
+        if len(self.errors) > 0:
+            raise Exception('Failed to parse the input files:\n' +
+                    '\n'.join(error.print() for error in self.errors))
+        return results[0], results[1:]
@@ -0,0 +1,229 @@
+from __future__ import annotations
+from typing import Any, BinaryIO, Dict, Iterator
+import json
+import sys
+import os
+import re
+
+root_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+if not root_path in sys.path:
+    sys.path.append(root_path)
+
+from common.structures.test_spec import (test_spec, step, step_type, signal, 
+        special_step_action)
+
+class json_stream_reader:
+    __structural = re.compile(rb'["\[\]{}]')
+    __string_special = re.compile(rb'["\\]')
+    __primitive_end = re.compile(rb'[\s,\]}]')
+    __whitespace = b' \t\r\n'
+
+    def __init__(self, file: BinaryIO, chunk_size: int = 0x10000) -> None:
+        self.file: BinaryIO = file
+        self.chunk_size: int = chunk_size
+        self.buffer: bytearray = bytearray()
+        self.pos: int = 0
+        self.base: int = file.tell()
+
+    def __fill(self) -> bool:
+        data = self.file.read(self.chunk_size)
+        if len(data) == 0:
+            return False
+        self.buffer += data
+        return True
+
+    def __compact(self) -> None:
+        if self.pos >= self.chunk_size:
+            del self.buffer[:self.pos]
+            self.base += self.pos
+            self.pos = 0
+
+    def __skip_string(self, index: int) -> int:
+        while True:
+            match = json_stream_reader.__string_special.search(self.buffer, index)
+            if match is None:
+                index = max(index, len(self.buffer))
+                if not self.__fill():
+                    raise Exception('Unterminated string in the test spec')
+                continue
+            if self.buffer[match.start()] == ord('\\'):
+                index = match.start() + 2
+                continue
+            return match.start() + 1
+
+    def tell(self) -> int:
+        return self.base + self.pos
+
+    def peek(self) -> str:
+        while True:
+            while (self.pos < len(self.buffer) and
+                    self.buffer[self.pos] in json_stream_reader.__whitespace):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return chr(self.buffer[self.pos])
+            if not self.__fill():
+                return None
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise Exception(f'Wrong test spec format at {self.tell()}, ' +
+                    f'expected "{char}"')
+        self.pos += 1
+        self.__compact()
+
+    def read_value(self) -> bytes:
+        first = self.peek()
+        if first is None:
+            raise Exception('Unexpected end of the test spec')
+        start = self.pos
+        index = start
+        if first in '{[':
+            depth = 0
+            while True:
+                match = json_stream_reader.__structural.search(self.buffer, index)
+                if match is None:
+                    index = len(self.buffer)
+                    if not self.__fill():
+                        raise Exception('Unexpected end of the test spec')
+                    continue
+                index = match.start()
+                char = self.buffer[index]
+                if char == ord('"'):
+                    index = self.__skip_string(index=index + 1)
+                    continue
+                index += 1
+                if char in b'{[':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        break
+        elif first == '"':
+            index = self.__skip_string(index=start + 1)
+        else:
+            while True:
+                match = json_stream_reader.__primitive_end.search(self.buffer,
+                        index)
+                if not match is None:
+                    index = match.start()
+                    break
+                index = len(self.buffer)
+                if not self.__fill():
+                    break
+        ret_val = bytes(self.buffer[start:index])
+        self.pos = index
+        self.__compact()
+        return ret_val
+
+class test_spec_header:
+    def __init__(self, spec_path: str, fields: Dict[str, Any],
+            steps_offset: int, steps_count: int,
+            step_signals: Dict[str, int]) -> None:
+        self.spec_path: str = spec_path
+        self.fields: Dict[str, Any] = fields
+        self.steps_offset: int = steps_offset
+        self.steps_count: int = steps_count
+        self.step_signals: Dict[str, int] = step_signals
+
+class lazy_steps:
+    def __init__(self, spec_path: str, offset: int, count: int,
+            test_spec: test_spec, signals: Dict[str, signal]) -> None:
+        self.spec_path: str = spec_path
+        self.offset: int = offset
+        self.count: int = count
+        self.test_spec: test_spec = test_spec
+        self.signals: Dict[str, signal] = signals
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[step]:
+        with open(self.spec_path, 'rb') as file:
+            file.seek(self.offset)
+            reader = json_stream_reader(file=file)
+            for step_spec in test_spec_parser.iterate_array(reader=reader):
+                yield test_spec.create_step_from_spec(test_spec=self.test_spec,
+                        spec=json.loads(step_spec), signals=self.signals)
+
+class test_spec_parser:
+    @staticmethod
+    def iterate_array(reader: json_stream_reader) -> Iterator[bytes]:
+        if reader.peek() == ']':
+            reader.expect(char=']')
+            return
+        while True:
+            yield reader.read_value()
+            if reader.peek() == ']':
+                reader.expect(char=']')
+                return
+            reader.expect(char=',')
+
+    @staticmethod
+    def check_step(spec: Dict[str, Any], step_number: int,
+            step_signals: Dict[str, int]) -> None:
+        try:
+            kind = step_type(spec['type'])
+            if kind == step_type.SPECIAL:
+                special_step_action(spec['step_action'])
+                spec['action_details']
+            elif kind == step_type.COMMON:
+                spec['control_signals']
+            else:
+                raise Exception(f'type {spec["type"]} is not implemented')
+            spec['action']
+            float(spec['duration_ms'])
+        except Exception as e:
+            raise Exception(f'Wrong step {step_number}: ' +
+                    f'{e.__class__.__name__} {e}')
+        for field in ['control_signals', 'monitored_signals', 'logged_signals']:
+            for signal_name in spec.get(field, {}):
+                if not signal_name in step_signals:
+                    step_signals[signal_name] = step_number
+
+    @staticmethod
+    def parse_header(spec_path: str) -> test_spec_header:
+        fields: Dict[str, Any] = {}
+        steps_offset = None
+        steps_count = 0
+        step_signals: Dict[str, int] = {}
+        with open(spec_path, 'rb') as file:
+            reader = json_stream_reader(file=file)
+            reader.expect(char='{')
+            while reader.peek() != '}':
+                key = json.loads(reader.read_value())
+                reader.expect(char=':')
+                if key == 'steps':
+                    reader.expect(char='[')
+                    steps_offset = reader.tell()
+                    for step_spec in test_spec_parser.iterate_array(
+                            reader=reader):
+                        steps_count += 1
+                        test_spec_parser.check_step(spec=json.loads(step_spec),
+                                step_number=steps_count,
+                                step_signals=step_signals)
+                else:
+                    fields[key] = json.loads(reader.read_value())
+                if reader.peek() == ',':
+                    reader.expect(char=',')
+            reader.expect(char='}')
+        if steps_offset is None:
+            raise Exception('Steps are missing in the test spec')
+        return test_spec_header(spec_path=spec_path, fields=fields,
+                steps_offset=steps_offset, steps_count=steps_count,
+                step_signals=step_signals)
+
+    @staticmethod
+    def create_test_spec(header: test_spec_header,
+            signals: Dict[str, signal]) -> test_spec:
+        for signal_name in header.step_signals:
+            if not signal_name in signals:
+                raise Exception(f'Signal {signal_name} of step ' +
+                        f'{header.step_signals[signal_name]} is missing in ' +
+                        'the input files')
+        ret_val = test_spec.create_from_spec(spec={**header.fields, 'steps': []},
+                signals=signals, base_path=os.path.dirname(
+                        os.path.abspath(header.spec_path)))
+        ret_val.steps = lazy_steps(spec_path=header.spec_path,
+                offset=header.steps_offset, count=header.steps_count,
+                test_spec=ret_val, signals=signals)
+        return ret_val
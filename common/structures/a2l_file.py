@@ -28,6 +28,16 @@ class a2l_signal:
                 lower_limit=spec['lower_limit'], 
                 record_layout=spec['record_layout'], source=source)   
 
+    def to_dict(self) -> Dict[str, str]:
+        ret_val: Dict[str, str] = {}
+        ret_val['name'] = self.name
+        ret_val['description'] = self.dscr
+        ret_val['address'] = self.address
+        ret_val['upper_limit'] = self.upper_limit
+        ret_val['lower_limit'] = self.lower_limit
+        ret_val['record_layout'] = self.record_layout
+        return ret_val
+
     def convert_to_test_spec_signal(self) -> signal:
         return signal(name=self.name, parent=self.parent, 
                 source_type=signal_source.A2L, source=self.source, 
@@ -61,6 +61,25 @@ class dbc_signal:
                 start_value=start_value, values=values, parent=parent, 
                 source=source, message_type=message_type)    
 
+    def to_dict(self) -> Dict[str, Any]:
+        ret_val: Dict[str, Any] = {}
+        ret_val['name'] = self.name
+        ret_val['position'] = self.position
+        ret_val['length'] = self.length
+        ret_val['factor'] = self.factor
+        ret_val['offset'] = self.offset
+        ret_val['min'] = self.min
+        ret_val['max'] = self.max
+        ret_val['unit'] = self.unit
+        ret_val['description'] = self.dscr
+        if not self.signal_type is None:
+            ret_val['signal_type'] = self.signal_type
+        if not self.start_value is None:
+            ret_val['start_value'] = self.start_value
+        if not self.values is None:
+            ret_val['values'] = self.values
+        return ret_val
+
     def convert_to_test_spec_signal(self) -> signal:
         direction = signal_direction.OUTOUT
         if self.message_type == dbc_message_type.INPUT:
@@ -132,6 +151,22 @@ class dbc_message:
                 message_type=message_type, period_ms=period_ms, 
                 frame_format=frame_format, source=source)  
 
+    def to_dict(self) -> Dict[str, Any]:
+        ret_val: Dict[str, Any] = {}
+        ret_val['name'] = self.name
+        ret_val['id'] = int(self.id, 16)
+        ret_val['length'] = self.length
+        ret_val['description'] = self.dscr
+        ret_val['message_type'] = self.message_type.value
+        if not self.period_ms is None:
+            ret_val['period_ms'] = self.period_ms
+        if not self.frame_format is None:
+            ret_val['frame_format'] = self.frame_format
+        ret_val['signals'] = {}
+        for signal in self.signals:
+            ret_val['signals'][signal] = self.signals[signal].to_dict()
+        return ret_val
+
     def prepare_data(self, signals: Dict[str, int], e2e_protection: bool = False,
             data_id: int = 0, cntr: int = 0) -> str:
         ret_val = 0xFFFFFFFFFFFFFFFF
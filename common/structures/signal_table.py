@@ -0,0 +1,147 @@
+from __future__ import annotations
+from typing import Any, List, Sequence, Tuple
+from collections import OrderedDict
+from array import array
+import bisect
+import hashlib
+import sys
+import csv
+import os
+
+signal_table_binary_extension: str = '.bin'
+signal_table_cache_size: int = 16
+
+# breakpoints are (time_ms, value) pairs sorted by time, the value is linearly
+# interpolated between them and held before the first and after the last one
+# binary profiles are little-endian float64 pairs: time_ms, value, time_ms, ...
+# at repeated times the value steps to the last breakpoint of the group
+class signal_table:
+    __cache: OrderedDict[Tuple[str, float, int], signal_table] = OrderedDict()
+
+    def __init__(self, times_ms: Sequence[float], values: Sequence[float],
+            source: str = None) -> None:
+        if len(times_ms) != len(values):
+            raise Exception('Signal table has different number of times and ' +
+                    'values')
+        if len(times_ms) == 0:
+            raise Exception('Signal table has no breakpoints')
+        for index in range(1, len(times_ms)):
+            if times_ms[index] < times_ms[index - 1]:
+                raise Exception('Signal table times are not sorted ' +
+                        f'(breakpoint {index})')
+        self.times_ms: array = array('d', times_ms)
+        self.values: array = array('d', values)
+        self.source: str = source
+
+    @staticmethod
+    def create_from_coef(coef: List[Any], base_path: str = None) -> signal_table:
+        if len(coef) == 1 and isinstance(coef[0], str):
+            file_path = coef[0]
+            if not base_path is None:
+                file_path = os.path.join(base_path, file_path)
+            return signal_table.load(file_path=file_path)
+        return signal_table(times_ms=[float(point[0]) for point in coef],
+                values=[float(point[1]) for point in coef])
+
+    @staticmethod
+    def load(file_path: str) -> signal_table:
+        file_path = os.path.abspath(file_path)
+        file_stat = os.stat(file_path)
+        key = (file_path, file_stat.st_mtime, file_stat.st_size)
+        if key in signal_table.__cache:
+            signal_table.__cache.move_to_end(key)
+            return signal_table.__cache[key]
+        if file_path.endswith(signal_table_binary_extension):
+            ret_val = signal_table.__load_binary(file_path=file_path)
+        else:
+            ret_val = signal_table.__load_csv(file_path=file_path)
+        signal_table.__cache[key] = ret_val
+        while len(signal_table.__cache) > signal_table_cache_size:
+            signal_table.__cache.popitem(last=False)
+        return ret_val
+
+    @staticmethod
+    def __load_csv(file_path: str) -> signal_table:
+        times_ms: array = array('d')
+        values: array = array('d')
+        with open(file_path, 'r', encoding='utf-8', newline='') as file:
+            for row_number, row in enumerate(csv.reader(file)):
+                if len(row) == 0 or row[0].strip().startswith('#'):
+                    continue
+                try:
+                    time_ms = float(row[0])
+                    value = float(row[1])
+                except (ValueError, IndexError):
+                    if row_number == 0:
+                        continue
+                    raise Exception(f'Wrong signal table row {row_number + 1} ' +
+                            f'in {file_path}')
+                times_ms.append(time_ms)
+                values.append(value)
+        return signal_table(times_ms=times_ms, values=values, source=file_path)
+
+    @staticmethod
+    def __load_binary(file_path: str) -> signal_table:
+        points: array = array('d')
+        with open(file_path, 'rb') as file:
+            content = file.read()
+        if len(content) % (2 * points.itemsize) != 0:
+            raise Exception(f'Wrong size of the binary signal table {file_path}')
+        points.frombytes(content)
+        if sys.byteorder != 'little':
+            points.byteswap()
+        return signal_table(times_ms=points[0::2], values=points[1::2],
+                source=file_path)
+
+    def calculate_hash(self) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(self.times_ms.tobytes())
+        hasher.update(self.values.tobytes())
+        return hasher.hexdigest()
+
+    def __interpolate_at(self, index: int, timestamp_ms: float) -> float:
+        if index == 0:
+            return self.values[0]
+        if index == len(self.times_ms):
+            return self.values[-1]
+        time0 = self.times_ms[index - 1]
+        time1 = self.times_ms[index]
+        value0 = self.values[index - 1]
+        if time1 == time0:
+            return self.values[index]
+        return value0 + (self.values[index] - value0) * \
+                (timestamp_ms - time0) / (time1 - time0)
+
+    def interpolate(self, timestamp_ms: float) -> float:
+        return self.__interpolate_at(
+                index=bisect.bisect_right(self.times_ms, timestamp_ms),
+                timestamp_ms=timestamp_ms)
+
+    def interpolate_many(self, timestamps_ms: Sequence[float]) -> List[float]:
+        times_ms = self.times_ms
+        values = self.values
+        last = len(times_ms)
+        search = bisect.bisect_right
+        ret_val: List[float] = []
+        append = ret_val.append
+        index = 0
+        previous_ms = float('-inf')
+        for timestamp_ms in timestamps_ms:
+            if timestamp_ms < previous_ms:
+                index = 0
+            index = search(times_ms, timestamp_ms, index)
+            previous_ms = timestamp_ms
+            if index == 0:
+                append(values[0])
+            elif index == last:
+                append(values[-1])
+            else:
+                time0 = times_ms[index - 1]
+                value0 = values[index - 1]
+                span = times_ms[index] - time0
+                if span == 0:
+                    append(values[index])
+                else:
+                    append(value0 + (values[index] - value0) * 
+                            (timestamp_ms - time0) / span)
+        return ret_val
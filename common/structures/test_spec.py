@@ -1,7 +1,10 @@
 from __future__ import annotations
-from typing import Dict, List, Any
+from typing import Dict, List, Any, TextIO
 from enum import Enum
+import itertools
+import hashlib
 import json
+import io
 import sys
 import os
 
@@ -9,6 +12,8 @@ root_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 if not root_path in sys.path:
     sys.path.append(root_path)
 
+from common.structures.signal_table import signal_table
+
 class signal_source(Enum):
     NOT_DEFINED = 0
     DBC = 1
@@ -30,6 +35,8 @@ class signal_form(Enum):
     HYPERBOLA = 6
     EXPONENTA = 7
     SINUS = 8   
+    TABLE = 9   # coef = [[time_ms, value], ...] or [profile_path relative to
+                # the test spec file], see signal_table
 
 #y = AMPLITUDE
 class constant_coef(Enum):
@@ -128,18 +135,25 @@ class signal:
         if signal1.origin != signal2.origin:
             return False
         return True
+
+    def update_hash(self, hasher: Any) -> None:
+        hasher.update(repr((self.name, self.parent, self.source_type.value, 
+                self.direction.value, self.value)).encode())
         
 class control_signal:
     def __init__(self, signal: signal, form: signal_form, 
-            coef: List[float]) -> None:
+            coef: List[float], base_path: str = None) -> None:
         self.signal: signal = signal
         self.form: signal_form = form
         self.coef: List[Any] = coef
+        self.base_path: str = base_path
+        self.__table: signal_table = None
 
     @staticmethod
-    def create_from_spec(signal: signal, spec: Dict[str, Any]) -> control_signal:
+    def create_from_spec(signal: signal, spec: Dict[str, Any], 
+            base_path: str = None) -> control_signal:
         return control_signal(signal=signal, form=signal_form(spec['form']), 
-                coef=spec['coef'])
+                coef=spec['coef'], base_path=base_path)
 
     @staticmethod
     def check_signals_equality(signal1: control_signal, 
@@ -153,6 +167,24 @@ class control_signal:
                 return False 
         return True
 
+    def update_hash(self, hasher: Any) -> None:
+        self.signal.update_hash(hasher=hasher)
+        hasher.update(repr((self.form.value, self.coef)).encode())
+        if self.form == signal_form.TABLE:
+            hasher.update(self.get_table().calculate_hash().encode())
+
+    def get_table(self) -> signal_table:
+        if self.__table is None:
+            self.__table = signal_table.create_from_coef(coef=self.coef, 
+                    base_path=self.base_path)
+        return self.__table
+
+    def calculate_references(self, timestamps_ms: List[float]) -> List[float]:
+        if self.form == signal_form.TABLE:
+            return self.get_table().interpolate_many(timestamps_ms=timestamps_ms)
+        return [self.calculate_reference(timestamp_ms=timestamp_ms) 
+                for timestamp_ms in timestamps_ms]
+
     def calculate_reference(self, timestamp_ms: float) -> float:
         ret_val = None
         if self.form == signal_form.CONSTANT:
@@ -172,6 +204,8 @@ class control_signal:
             raise Exception('Not implemented')
         elif self.form == signal_form.SINUS:
             raise Exception('Not implemented')
+        elif self.form == signal_form.TABLE:
+            ret_val = self.get_table().interpolate(timestamp_ms=timestamp_ms)
         return ret_val
 
     def to_dict(self) -> Dict[str, Any]:
@@ -202,6 +236,10 @@ class monitored_range:
             return False
         return True
 
+    def update_hash(self, hasher: Any) -> None:
+        hasher.update(repr((self.start_ms, self.stop_ms, 
+                self.tolerance)).encode())
+
     def to_dict(self) -> Dict[str, Any]:
         ret_val: Dict[str, Any] = {}
         ret_val['start_ms'] = self.start_ms
@@ -211,19 +249,22 @@ class monitored_range:
 
 class monitored_signal:
     def __init__(self, signal: signal, ranges: List[monitored_range], 
-            form: signal_form, coef: List[float]) -> None:
+            form: signal_form, coef: List[float], base_path: str = None) -> None:
         self.signal: signal = signal
         self.ranges: List[monitored_range] = ranges
         self.form: signal_form = form
         self.coef: List[float] = coef
+        self.base_path: str = base_path
+        self.__table: signal_table = None
 
     @staticmethod
-    def create_from_spec(signal: signal, 
-            spec: Dict[str, float]) -> monitored_signal:
+    def create_from_spec(signal: signal, spec: Dict[str, float], 
+            base_path: str = None) -> monitored_signal:
         return monitored_signal(signal=signal, 
                 ranges=monitored_signal.__prepare_monitored_ranges(
                         spec=spec['monitored_ranges']),
-                form=signal_form(spec['form']), coef=spec['coef'])
+                form=signal_form(spec['form']), coef=spec['coef'], 
+                base_path=base_path)
 
     @staticmethod
     def check_signals_equality(signal1: monitored_signal, 
@@ -243,6 +284,20 @@ class monitored_signal:
                 return False 
         return True
 
+    def update_hash(self, hasher: Any) -> None:
+        self.signal.update_hash(hasher=hasher)
+        for range in self.ranges:
+            range.update_hash(hasher=hasher)
+        hasher.update(repr((self.form.value, self.coef)).encode())
+        if self.form == signal_form.TABLE:
+            hasher.update(self.get_table().calculate_hash().encode())
+
+    def get_table(self) -> signal_table:
+        if self.__table is None:
+            self.__table = signal_table.create_from_coef(coef=self.coef, 
+                    base_path=self.base_path)
+        return self.__table
+
     @staticmethod
     def __prepare_monitored_ranges(
             spec: List[Dict[str, float]]) -> List[monitored_range]:
@@ -273,6 +328,8 @@ class monitored_signal:
             raise Exception('Not implemented')
         elif self.form == signal_form.SINUS:
             raise Exception('Not implemented')
+        elif self.form == signal_form.TABLE:
+            ret_val = self.get_table().interpolate(timestamp_ms=timestamp_ms)
         return ret_val
 
     def to_dict(self) -> Dict[str, Any]:
@@ -292,6 +349,9 @@ class logged_signal:
     def create_from_spec(signal: signal, spec: Dict[str, float]) -> logged_signal:
         return logged_signal(signal=signal)
 
+    def update_hash(self, hasher: Any) -> None:
+        self.signal.update_hash(hasher=hasher)
+
     def to_dict(self) -> Dict[str, Any]:
         ret_val: Dict[str, Any] = {}
         return ret_val
@@ -313,7 +373,8 @@ class step:
         monitored_signals: Dict[str, monitored_signal] = {}
         if 'monitored_signals' in spec:
             monitored_signals = step.__prepare_monitored_signals(
-                    spec=spec['monitored_signals'], signals=signals)
+                    spec=spec['monitored_signals'], signals=signals, 
+                    base_path=test_spec.base_path)
         logged_signals: Dict[str, logged_signal] = {}
         if 'logged_signals' in spec:
             logged_signals = step.__prepare_logged_signals(
@@ -325,13 +386,15 @@ class step:
         
     @staticmethod
     def __prepare_monitored_signals(spec: List[Dict[str, Any]], 
-            signals: Dict[str, signal]) -> Dict[str, monitored_signal]:
+            signals: Dict[str, signal], 
+            base_path: str = None) -> Dict[str, monitored_signal]:
         monitored_signals: Dict[str, monitored_signal] = {}
         for signal_spec in spec:
             if not signal_spec in signals:
                 raise Exception('Signal is missing in the input files')
             monitored_signals[signal_spec] = monitored_signal.create_from_spec(
-                    signal=signals[signal_spec], spec=spec[signal_spec])
+                    signal=signals[signal_spec], spec=spec[signal_spec], 
+                    base_path=base_path)
         return monitored_signals
 
     @staticmethod
@@ -345,6 +408,19 @@ class step:
                     signal=signals[signal_spec], spec=spec[signal_spec])
         return logged_signals
 
+    @staticmethod
+    def update_signals_hash(signals: Dict[str, Any], hasher: Any) -> None:
+        hasher.update(repr(len(signals)).encode())
+        for signal in sorted(signals):
+            hasher.update(repr(signal).encode())
+            signals[signal].update_hash(hasher=hasher)
+
+    def update_hash(self, hasher: Any) -> None:
+        hasher.update(repr((self.type.value, self.action, 
+                self.duration_ms)).encode())
+        step.update_signals_hash(signals=self.monitored_signals, hasher=hasher)
+        step.update_signals_hash(signals=self.logged_signals, hasher=hasher)
+
     def to_dict(self) -> Dict[str, Any]:
         ret_val: Dict[str, Any] = {}
         ret_val['type'] = self.type.value
@@ -378,7 +454,7 @@ class common_step(step):
                 spec=spec, signals=signals)
         ret_val.control_signals: Dict[str, control_signal] = \
                 common_step.__prepare_control_signals(spec=spec['control_signals'], 
-                        signals=signals)
+                        signals=signals, base_path=test_spec.base_path)
         return ret_val
 
     @staticmethod
@@ -390,15 +466,21 @@ class common_step(step):
 
     @staticmethod
     def __prepare_control_signals(spec: List[Dict[str, Any]], 
-            signals: Dict[str, signal]) -> Dict[str, control_signal]:
+            signals: Dict[str, signal], 
+            base_path: str = None) -> Dict[str, control_signal]:
         control_signals: Dict[str, control_signal] = {}
         for signal_spec in spec:
             if not signal_spec in signals:
                 raise Exception('Signal is missing in the input files')
             control_signals[signal_spec] = control_signal.create_from_spec(
-                    signal=signals[signal_spec], spec=spec[signal_spec])
+                    signal=signals[signal_spec], spec=spec[signal_spec], 
+                    base_path=base_path)
         return control_signals
 
+    def update_hash(self, hasher: Any) -> None:
+        step.update_hash(self=self, hasher=hasher)
+        step.update_signals_hash(signals=self.control_signals, hasher=hasher)
+
     def to_dict(self) -> Dict[str, Any]:
         ret_val: Dict[str, Any] = step.to_dict(self=self)
         ret_val['control_signals'] = {}
@@ -429,6 +511,11 @@ class special_step(step):
         ret_val.action_details: Any = spec['action_details']
         return ret_val
 
+    def update_hash(self, hasher: Any) -> None:
+        step.update_hash(self=self, hasher=hasher)
+        hasher.update(repr((self.step_action.value, json.dumps(
+                self.action_details, sort_keys=True))).encode())
+
     def to_dict(self) -> Dict[str, Any]:
         ret_val: Dict[str, Any] = step.to_dict(self=self)
         ret_val['step_action'] = self.step_action.value
@@ -438,7 +525,8 @@ class special_step(step):
 class test_spec:
     def __init__(self, name: str, dscr: str, initial_state: common_step, 
             steps: List[step], used_signals: List[str], 
-            xray_id: str = None) -> None:
+            xray_id: str = None, reading_interval_ms: float = None, 
+            base_path: str = None) -> None:
         self.name: str = name
         self.dscr: str = dscr
         self.initial_state: common_step = initial_state
@@ -447,35 +535,47 @@ class test_spec:
         if xray_id == None:
             self.xray_id: str = test_spec.__define_xray_id(name)
         self.used_signals: List[str] = used_signals
+        self.reading_interval_ms: float = reading_interval_ms
+        self.base_path: str = base_path
 
     @staticmethod
     def __prepare_steps(test_spec: test_spec, spec: List[Any], 
             signals: Dict[str, signal]) -> List[step]:
         ret_val: List[step] = []
         for step_spec in spec:
-            if step_type(step_spec['type']) == step_type.COMMON:
-                ret_val.append(common_step.create_from_spec(test_spec=test_spec, 
-                        spec=step_spec, signals=signals))
-            elif step_type(step_spec['type']) == step_type.SPECIAL:
-                ret_val.append(special_step.create_from_spec(test_spec=test_spec, 
-                        spec=step_spec, signals=signals))
-            else:
-                raise Exception(f'Type {step_spec["type"]} is not implemented')
+            ret_val.append(test_spec.create_step_from_spec(test_spec=test_spec, 
+                    spec=step_spec, signals=signals))
         return ret_val
 
+    @staticmethod
+    def create_step_from_spec(test_spec: test_spec, spec: Dict[str, Any], 
+            signals: Dict[str, signal]) -> step:
+        if step_type(spec['type']) == step_type.COMMON:
+            return common_step.create_from_spec(test_spec=test_spec, 
+                    spec=spec, signals=signals)
+        elif step_type(spec['type']) == step_type.SPECIAL:
+            return special_step.create_from_spec(test_spec=test_spec, 
+                    spec=spec, signals=signals)
+        else:
+            raise Exception(f'Type {spec["type"]} is not implemented')
+
     @staticmethod
     def __define_xray_id(name: str) -> str:
         raise Exception('Definition of the test XRAY ID is not implemented yet')
 
     @staticmethod
-    def create_from_spec(spec: Dict[str, Any], 
-            signals: Dict[str, signal]) -> test_spec:
+    def create_from_spec(spec: Dict[str, Any], signals: Dict[str, signal], 
+            base_path: str = None) -> test_spec:
         xray_id: str = None
         if 'xray_id' in spec:
             xray_id: str = spec['xray_id']
+        reading_interval_ms: float = None
+        if 'reading_interval_ms' in spec:
+            reading_interval_ms: float = spec['reading_interval_ms']
         ret_val: test_spec = test_spec(name=spec['name'], dscr=spec['dscr'], 
                 initial_state=None, steps=None, used_signals=spec['used_signals'], 
-                xray_id=xray_id)
+                xray_id=xray_id, reading_interval_ms=reading_interval_ms, 
+                base_path=base_path)
         ret_val.initial_state = common_step.create_from_spec(test_spec=ret_val,
                 spec=spec['initial_state'], signals=signals)
         ret_val.steps = test_spec.__prepare_steps(test_spec=ret_val, 
@@ -488,28 +588,55 @@ class test_spec:
                 initial_state=common_step.create_empty(), steps=[], xray_id='')
         return ret_val
 
+    @staticmethod
+    def __collect_used_signals(step: step, used_signals: Dict[str, None]) -> None:
+        if step.type == step_type.COMMON:
+            used_signals.update(dict.fromkeys(step.control_signals))
+        used_signals.update(dict.fromkeys(step.monitored_signals))
+        used_signals.update(dict.fromkeys(step.logged_signals))
+
+    @staticmethod
+    def __prepare_step_dict(step: step) -> Dict[str, Any]:
+        if step.type == step_type.COMMON:
+            return common_step.to_dict(self=step)
+        elif step.type == step_type.SPECIAL:
+            return special_step.to_dict(self=step)
+        return None
+
+    @staticmethod
+    def __update_step_hash(step: step, hasher: Any) -> None:
+        if step.type == step_type.COMMON:
+            common_step.update_hash(self=step, hasher=hasher)
+        elif step.type == step_type.SPECIAL:
+            special_step.update_hash(self=step, hasher=hasher)
+        else:
+            raise Exception(f'Type {step.type} is not implemented')
+
+    def calculate_hash(self) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(repr((self.name, self.dscr, self.xray_id, 
+                self.reading_interval_ms)).encode())
+        test_spec.__update_step_hash(step=self.initial_state, hasher=hasher)
+        for step in self.steps:
+            test_spec.__update_step_hash(step=step, hasher=hasher)
+        return hasher.hexdigest()
+
     def __prepare_list_of_used_signals(self) -> List[str]:
+        ret_val: Dict[str, None] = {}
+        for step in itertools.chain([self.initial_state], self.steps):
+            test_spec.__collect_used_signals(step=step, used_signals=ret_val)
+        return list(ret_val)
+
+    def prepare_list_of_observed_messages(self) -> List[str]:
         ret_val: List[str] = []
-        for signal in self.initial_state.control_signals:
-            if not signal in ret_val:
-                ret_val.append(signal)
-        for signal in self.initial_state.monitored_signals:
-            if not signal in ret_val:
-                ret_val.append(signal)
-        for signal in self.initial_state.logged_signals:
-            if not signal in ret_val:
-                ret_val.append(signal)
-        for step in self.steps:
-            if step.type == step_type.COMMON:
-                for signal in step.control_signals:
-                    if not signal in ret_val:
-                        ret_val.append(signal)
-            for signal in step.monitored_signals:
-                if not signal in ret_val:
-                    ret_val.append(signal)
-            for signal in step.logged_signals:
-                if not signal in ret_val:
-                    ret_val.append(signal)
+        for step in itertools.chain([self.initial_state], self.steps):
+            for signals in [step.monitored_signals, step.logged_signals]:
+                for signal in signals:
+                    definition = signals[signal].signal
+                    if definition.source_type != signal_source.DBC:
+                        continue
+                    if not definition.parent in ret_val:
+                        ret_val.append(definition.parent)
         return ret_val
 
     def to_dict(self) -> Dict[str, Any]:
@@ -517,15 +644,43 @@ class test_spec:
         ret_val['name'] = self.name
         ret_val['dscr'] = self.dscr
         ret_val['xray_id'] = self.xray_id
+        if not self.reading_interval_ms is None:
+            ret_val['reading_interval_ms'] = self.reading_interval_ms
         ret_val['initial_state'] = common_step.to_dict(self=self.initial_state)
         ret_val['steps'] = []
         for step in self.steps:
-            if step.type == step_type.COMMON:
-                ret_val['steps'].append(common_step.to_dict(self=step))
-            elif step.type == step_type.SPECIAL:
-                ret_val['steps'].append(special_step.to_dict(self=step))
+            step_dict = test_spec.__prepare_step_dict(step=step)
+            if not step_dict is None:
+                ret_val['steps'].append(step_dict)
         ret_val['used_signals'] = self.__prepare_list_of_used_signals()
         return ret_val
 
-    def to_json(self) -> json:
+    def write_json(self, file: TextIO) -> None:
+        encoder = json.JSONEncoder(separators=(',', ':'))
+        used_signals: Dict[str, None] = {}
+        file.write(f'{{"name":{encoder.encode(self.name)}')
+        file.write(f',"dscr":{encoder.encode(self.dscr)}')
+        file.write(f',"xray_id":{encoder.encode(self.xray_id)}')
+        if not self.reading_interval_ms is None:
+            file.write(f',"reading_interval_ms":' + 
+                    f'{encoder.encode(self.reading_interval_ms)}')
+        file.write(',"initial_state":')
+        file.write(encoder.encode(common_step.to_dict(self=self.initial_state)))
+        test_spec.__collect_used_signals(step=self.initial_state, 
+                used_signals=used_signals)
+        file.write(',"steps":[')
+        separator = ''
+        for step in self.steps:
+            step_dict = test_spec.__prepare_step_dict(step=step)
+            if not step_dict is None:
+                file.write(separator + encoder.encode(step_dict))
+                separator = ','
+            test_spec.__collect_used_signals(step=step, used_signals=used_signals)
+        file.write(f'],"used_signals":{encoder.encode(list(used_signals))}}}')
+
+    def to_json(self, compact: bool = False) -> json:
+        if compact:
+            buffer = io.StringIO()
+            self.write_json(file=buffer)
+            return buffer.getvalue()
         return json.dumps(self.to_dict(), indent=4)
\ No newline at end of file
@@ -0,0 +1,156 @@
+from __future__ import annotations
+from typing import Any, Dict, List
+import hashlib
+import json
+import sys
+import os
+
+root_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+if not root_path in sys.path:
+    sys.path.append(root_path)
+
+from common.structures.test_spec import signal, signal_source
+from common.structures.a2l_file import a2l_signal
+from common.structures.dbc_file import dbc_message
+
+test_spec_artifact_extension: str = '.pilc'
+test_spec_artifact_format: str = 'pil_test_spec_artifact'
+test_spec_artifact_version: int = 3
+
+# the artifact is a JSON document:
+# {"format": ..., "version": ..., "spec": {test spec},
+#  "signals": {spec signal name: {"source_type": 2, "source": a2l path,
+#       "definition": {a2l signal}} or {"source_type": 1, "message": name,
+#       "signal": name}},
+#  "dbc_messages": {name: {"source": dbc path, "definition": {dbc message}}},
+#  "dbc_paths": [...], "sources": {absolute path: sha256},
+#  "base_path": directory of the test spec file}
+class test_spec_artifact:
+    def __init__(self, spec: Dict[str, Any], signals: Dict[str, Any],
+            dbc_messages: Dict[str, dbc_message], dbc_paths: List[str],
+            sources: Dict[str, str], base_path: str) -> None:
+        self.spec: Dict[str, Any] = spec
+        self.signals: Dict[str, Any] = signals
+        self.dbc_messages: Dict[str, dbc_message] = dbc_messages
+        self.dbc_paths: List[str] = dbc_paths
+        self.sources: Dict[str, str] = sources
+        self.base_path: str = base_path
+
+    @staticmethod
+    def calculate_file_hash(file_path: str) -> str:
+        ret_val = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(0x100000), b''):
+                ret_val.update(chunk)
+        return ret_val.hexdigest()
+
+    @staticmethod
+    def create_from_sources(spec: Dict[str, Any], signals: Dict[str, Any],
+            dbc_messages: Dict[str, dbc_message], dbc_paths: List[str],
+            source_paths: List[str], base_path: str) -> test_spec_artifact:
+        used_messages: Dict[str, dbc_message] = {}
+        for signal_name in signals:
+            parent = signals[signal_name].parent
+            if parent in dbc_messages:
+                used_messages[parent] = dbc_messages[parent]
+        sources: Dict[str, str] = {}
+        for source_path in source_paths:
+            sources[os.path.abspath(source_path)] = \
+                    test_spec_artifact.calculate_file_hash(file_path=source_path)
+        return test_spec_artifact(spec=spec, signals=signals,
+                dbc_messages=used_messages, dbc_paths=dbc_paths,
+                sources=sources, base_path=os.path.abspath(base_path))
+
+    @staticmethod
+    def __prepare_signals(spec: Dict[str, Dict[str, Any]],
+            dbc_messages: Dict[str, dbc_message]) -> Dict[str, Any]:
+        ret_val: Dict[str, Any] = {}
+        for signal_name in spec:
+            signal_spec = spec[signal_name]
+            source_type = signal_source(signal_spec['source_type'])
+            if source_type == signal_source.A2L:
+                ret_val[signal_name] = a2l_signal.create_from_spec(
+                        spec=signal_spec['definition'],
+                        source=signal_spec['source'])
+            elif source_type == signal_source.DBC:
+                ret_val[signal_name] = dbc_messages[
+                        signal_spec['message']].signals[signal_spec['signal']]
+            else:
+                raise Exception(f'{source_type} of the signal {signal_name} ' +
+                        'is not supported')
+        return ret_val
+
+    @staticmethod
+    def load(file_path: str) -> test_spec_artifact:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            try:
+                content: Dict[str, Any] = json.loads(file.read())
+            except ValueError:
+                raise Exception(f'{file_path} is not a compiled test spec')
+        if (not isinstance(content, dict) or
+                content.get('format') != test_spec_artifact_format):
+            raise Exception(f'{file_path} is not a compiled test spec')
+        if content['version'] != test_spec_artifact_version:
+            raise Exception(f'Version {content["version"]} of the compiled ' +
+                    'test spec is not supported, compile the spec again')
+        dbc_messages: Dict[str, dbc_message] = {}
+        for message_name in content['dbc_messages']:
+            message_spec = content['dbc_messages'][message_name]
+            dbc_messages[message_name] = dbc_message.create_from_spec(
+                    spec=message_spec['definition'],
+                    source=message_spec['source'])
+        return test_spec_artifact(spec=content['spec'],
+                signals=test_spec_artifact.__prepare_signals(
+                        spec=content['signals'], dbc_messages=dbc_messages),
+                dbc_messages=dbc_messages, dbc_paths=content['dbc_paths'],
+                sources=content['sources'], base_path=content['base_path'])
+
+    def to_dict(self) -> Dict[str, Any]:
+        ret_val: Dict[str, Any] = {}
+        ret_val['format'] = test_spec_artifact_format
+        ret_val['version'] = test_spec_artifact_version
+        ret_val['spec'] = self.spec
+        ret_val['signals'] = {}
+        for signal_name in self.signals:
+            definition = self.signals[signal_name]
+            source_type = definition.convert_to_test_spec_signal().source_type
+            if source_type == signal_source.A2L:
+                ret_val['signals'][signal_name] = {
+                        'source_type': source_type.value,
+                        'source': definition.source,
+                        'definition': definition.to_dict()}
+            else:
+                ret_val['signals'][signal_name] = {
+                        'source_type': source_type.value,
+                        'message': definition.parent,
+                        'signal': definition.name}
+        ret_val['dbc_messages'] = {}
+        for message_name in self.dbc_messages:
+            message = self.dbc_messages[message_name]
+            ret_val['dbc_messages'][message_name] = {'source': message.source,
+                    'definition': message.to_dict()}
+        ret_val['dbc_paths'] = self.dbc_paths
+        ret_val['sources'] = self.sources
+        ret_val['base_path'] = self.base_path
+        return ret_val
+
+    def save(self, file_path: str) -> None:
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(self.to_dict(), separators=(',', ':')))
+
+    def find_stale_sources(self) -> List[str]:
+        ret_val: List[str] = []
+        for source_path in self.sources:
+            if not os.path.exists(source_path):
+                ret_val.append(source_path)
+            elif test_spec_artifact.calculate_file_hash(
+                    file_path=source_path) != self.sources[source_path]:
+                ret_val.append(source_path)
+        return ret_val
+
+    def prepare_test_spec_signals(self) -> Dict[str, signal]:
+        ret_val: Dict[str, signal] = {}
+        for signal_name in self.signals:
+            ret_val[signal_name] = \
+                    self.signals[signal_name].convert_to_test_spec_signal()
+        return ret_val
@@ -0,0 +1,95 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+from datetime import datetime
+import asyncio
+import json
+import time
+
+class dump_record:
+    def __init__(self, step_number: int, action: str, file_path: str,
+            size: int, duration_s: float) -> None:
+        self.step_number: int = step_number
+        self.action: str = action
+        self.file_path: str = file_path
+        self.size: int = size
+        self.duration_s: float = duration_s
+
+    def get_throughput_kbps(self) -> float:
+        if self.duration_s <= 0:
+            return 0.0
+        return self.size / 1024 / self.duration_s
+
+    def print(self) -> str:
+        return (f'{self.size} bytes to {self.file_path}, ' +
+                f'{self.duration_s:.3f} s, ' +
+                f'{self.get_throughput_kbps():.1f} kB/s')
+
+    def to_dict(self) -> Dict[str, Any]:
+        ret_val: Dict[str, Any] = {}
+        ret_val['timestamp'] = datetime.now().isoformat()
+        ret_val['step'] = self.step_number
+        ret_val['action'] = self.action
+        ret_val['file'] = self.file_path
+        ret_val['size'] = self.size
+        ret_val['duration_s'] = self.duration_s
+        return ret_val
+
+class dump_transfer:
+    def __init__(self, read_block: Callable[[int, int], Awaitable[bytes]],
+            size: int, file_path: str, chunk_size: int = 0x1000,
+            window: int = 8, retries: int = 3) -> None:
+        if chunk_size <= 0:
+            raise Exception('Dump chunk size must be positive')
+        if window <= 0:
+            raise Exception('Dump transfer window must be positive')
+        self.read_block: Callable[[int, int], Awaitable[bytes]] = read_block
+        self.size: int = size
+        self.file_path: str = file_path
+        self.chunk_size: int = chunk_size
+        self.window: int = window
+        self.retries: int = retries
+
+    async def __read_chunk(self, file: Any, offset: int) -> None:
+        size = min(self.chunk_size, self.size - offset)
+        for attempt in range(self.retries + 1):
+            try:
+                data = await self.read_block(offset=offset, size=size)
+                break
+            except Exception:
+                if attempt == self.retries:
+                    raise
+        if len(data) != size:
+            raise Exception(f'Dump chunk at {offset} has {len(data)} bytes, ' +
+                    f'{size} bytes expected')
+        file.seek(offset)
+        file.write(data)
+
+    async def run(self) -> float:
+        start_ns = time.monotonic_ns()
+        with open(self.file_path, 'wb') as file:
+            file.truncate(self.size)
+            pending: Iterable[int] = iter(range(0, self.size, self.chunk_size))
+            async def worker() -> None:
+                for offset in pending:
+                    await self.__read_chunk(file=file, offset=offset)
+            workers = [asyncio.ensure_future(worker())
+                    for _ in range(self.window)]
+            try:
+                await asyncio.gather(*workers)
+            except:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+        return (time.monotonic_ns() - start_ns) / 1000000000
+
+class dump_index:
+    def __init__(self, file_path: str) -> None:
+        self.file_path: str = file_path
+        self.records: List[dump_record] = []
+        with open(self.file_path, 'w', encoding='utf-8'):
+            pass
+
+    def add(self, record: dump_record) -> None:
+        self.records.append(record)
+        with open(self.file_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record.to_dict()) + '\n')
@@ -0,0 +1,144 @@
+from __future__ import annotations
+from typing import Any, Callable, Iterable, List, Tuple
+import hashlib
+import asyncio
+import mmap
+import time
+import os
+
+# only transport and timeout errors of a block are retried, any other error
+# of the DUT adapter aborts the transfer
+firmware_transfer_retried_errors: Tuple[type, ...] = (ConnectionError,
+        TimeoutError, asyncio.TimeoutError)
+
+class firmware_transfer_report:
+    def __init__(self, image_path: str, size: int, blocks: int,
+            retried_blocks: int, duration_s: float) -> None:
+        self.image_path: str = image_path
+        self.size: int = size
+        self.blocks: int = blocks
+        self.retried_blocks: int = retried_blocks
+        self.duration_s: float = duration_s
+
+    def get_throughput_kbps(self) -> float:
+        if self.duration_s <= 0:
+            return 0.0
+        return self.size / 1024 / self.duration_s
+
+    def print(self) -> str:
+        return (f'{self.size} bytes in {self.blocks} blocks, ' +
+                f'{self.duration_s:.3f} s, ' +
+                f'{self.get_throughput_kbps():.1f} kB/s, ' +
+                f'{self.retried_blocks} blocks retried')
+
+class firmware_transfer:
+    def __init__(self, dut: Any, image_path: str, block_size: int = 0x400,
+            window: int = 16, retries: int = 3,
+            progress_callback: Callable[[int, int], None] = None,
+            progress_step: float = 0.1) -> None:
+        if block_size <= 0:
+            raise Exception('Firmware block size must be positive')
+        if window <= 0:
+            raise Exception('Firmware transfer window must be positive')
+        self.dut: Any = dut
+        self.image_path: str = image_path
+        self.block_size: int = block_size
+        self.window: int = window
+        self.retries: int = retries
+        self.progress_callback: Callable[[int, int], None] = progress_callback
+        self.progress_step: float = progress_step
+        self.size: int = 0
+        self.sent_bytes: int = 0
+        self.retried_blocks: int = 0
+        self.__image: memoryview = None
+        self.__next_progress: float = 0.0
+        self.__last_error: Exception = None
+
+    @staticmethod
+    def create_from_spec(dut: Any, spec: Any,
+            progress_callback: Callable[[int, int], None] = None
+            ) -> firmware_transfer:
+        if isinstance(spec, str):
+            spec = {'image': spec}
+        return firmware_transfer(dut=dut, image_path=spec['image'],
+                block_size=spec.get('block_size', 0x400),
+                window=spec.get('window', 16),
+                retries=spec.get('retries', 3),
+                progress_callback=progress_callback)
+
+    def __report_progress(self) -> None:
+        if self.progress_callback is None:
+            return
+        if self.sent_bytes >= self.__next_progress * self.size:
+            self.progress_callback(self.sent_bytes, self.size)
+            self.__next_progress = min(
+                    self.sent_bytes / self.size + self.progress_step, 1.0)
+
+    async def __send_block(self, index: int) -> bool:
+        offset = index * self.block_size
+        data = bytes(self.__image[offset:offset + self.block_size])
+        try:
+            if await self.dut.write_firmware_block(offset=offset,
+                    data=data) == False:
+                return False
+        except firmware_transfer_retried_errors as e:
+            self.__last_error = e
+            return False
+        self.sent_bytes += len(data)
+        self.__report_progress()
+        return True
+
+    async def __send_blocks(self, indexes: List[int]) -> List[int]:
+        pending: Iterable[int] = iter(indexes)
+        failed: List[int] = []
+        async def worker() -> None:
+            for index in pending:
+                if not await self.__send_block(index=index):
+                    failed.append(index)
+        workers = [asyncio.ensure_future(worker())
+                for _ in range(min(self.window, len(indexes)))]
+        try:
+            await asyncio.gather(*workers)
+        except:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        return sorted(failed)
+
+    async def run(self) -> firmware_transfer_report:
+        start_ns = time.monotonic_ns()
+        with open(self.image_path, 'rb') as file:
+            self.size = os.fstat(file.fileno()).st_size
+            if self.size == 0:
+                raise Exception(f'Firmware image {self.image_path} is empty')
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as image:
+                self.__image = memoryview(image)
+                try:
+                    checksum = hashlib.sha256(self.__image).hexdigest()
+                    blocks = (self.size + self.block_size - 1) // self.block_size
+                    await self.dut.start_firmware_update(size=self.size,
+                            block_size=self.block_size)
+                    failed = await self.__send_blocks(indexes=list(range(blocks)))
+                    attempt = 0
+                    while len(failed) > 0 and attempt < self.retries:
+                        attempt += 1
+                        self.retried_blocks += len(failed)
+                        failed = await self.__send_blocks(indexes=failed)
+                    if len(failed) > 0:
+                        cause = ''
+                        if not self.__last_error is None:
+                            cause = ', last error: ' + \
+                                    f'{type(self.__last_error).__name__}: ' + \
+                                    f'{self.__last_error}'
+                        raise Exception(f'Firmware update failed: {len(failed)} ' +
+                                f'blocks were not accepted after {self.retries} ' +
+                                f'retries{cause}') from self.__last_error
+                    await self.dut.finish_firmware_update(sha256=checksum)
+                finally:
+                    self.__image.release()
+                    self.__image = None
+        return firmware_transfer_report(image_path=self.image_path,
+                size=self.size, blocks=blocks,
+                retried_blocks=self.retried_blocks,
+                duration_s=(time.monotonic_ns() - start_ns) / 1000000000)
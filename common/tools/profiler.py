@@ -0,0 +1,139 @@
+from typing import Any, Dict, Iterator, List, Tuple
+from contextlib import contextmanager
+from collections import Counter
+from datetime import datetime
+import threading
+import time
+import json
+import sys
+
+class phase_record:
+    def __init__(self, name: str, thread: str, wall_s: float,
+            cpu_thread_s: float, cpu_process_s: float) -> None:
+        self.name: str = name
+        self.thread: str = thread
+        self.wall_s: float = wall_s
+        self.cpu_thread_s: float = cpu_thread_s
+        self.cpu_process_s: float = cpu_process_s
+
+    def to_dict(self) -> Dict[str, Any]:
+        ret_val: Dict[str, Any] = {}
+        ret_val['name'] = self.name
+        ret_val['thread'] = self.thread
+        ret_val['wall_s'] = self.wall_s
+        ret_val['cpu_thread_s'] = self.cpu_thread_s
+        ret_val['cpu_process_s'] = self.cpu_process_s
+        return ret_val
+
+class phase_profiler:
+    def __init__(self, enabled: bool = False, sampling: bool = False,
+            sampling_interval_s: float = 0.005, stack_depth: int = 16) -> None:
+        self.enabled: bool = enabled
+        self.sampling: bool = sampling
+        self.sampling_interval_s: float = sampling_interval_s
+        self.stack_depth: int = stack_depth
+        self.phases: List[phase_record] = []
+        self.samples: Counter = Counter()
+        self.samples_total: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+        self.__started: Dict[Tuple[int, str], Tuple[float, float, float]] = {}
+        self.__sampling_thread: threading.Thread = None
+        self.__stop_event: threading.Event = threading.Event()
+
+    def start_phase(self, name: str) -> None:
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.__started[(threading.get_ident(), name)] = (
+                    time.perf_counter(), time.thread_time(), time.process_time())
+
+    def stop_phase(self, name: str) -> None:
+        if not self.enabled:
+            return
+        with self.__lock:
+            key = (threading.get_ident(), name)
+            if not key in self.__started:
+                return
+            wall, cpu_thread, cpu_process = self.__started.pop(key)
+            self.phases.append(phase_record(name=name,
+                    thread=threading.current_thread().name,
+                    wall_s=time.perf_counter() - wall,
+                    cpu_thread_s=time.thread_time() - cpu_thread,
+                    cpu_process_s=time.process_time() - cpu_process))
+
+    def add_phase(self, name: str, thread: str, wall_s: float,
+            cpu_thread_s: float = 0.0, cpu_process_s: float = 0.0) -> None:
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.phases.append(phase_record(name=name, thread=thread,
+                    wall_s=wall_s, cpu_thread_s=cpu_thread_s,
+                    cpu_process_s=cpu_process_s))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.start_phase(name=name)
+        try:
+            yield
+        finally:
+            self.stop_phase(name=name)
+
+    def __prepare_stack(self, frame: Any) -> Tuple[str, ...]:
+        ret_val: List[str] = []
+        while not frame is None and len(ret_val) < self.stack_depth:
+            code = frame.f_code
+            ret_val.append(f'{code.co_filename}:{code.co_name}:{frame.f_lineno}')
+            frame = frame.f_back
+        return tuple(reversed(ret_val))
+
+    def __sampling_thread_handle(self, thread_ident: int) -> None:
+        while not self.__stop_event.wait(self.sampling_interval_s):
+            frame = sys._current_frames().get(thread_ident)
+            if frame is None:
+                continue
+            stack = self.__prepare_stack(frame=frame)
+            with self.__lock:
+                self.samples[stack] += 1
+                self.samples_total += 1
+
+    def start_sampling(self, thread_ident: int) -> None:
+        if not self.enabled or not self.sampling:
+            return
+        self.__stop_event.clear()
+        self.__sampling_thread = threading.Thread(
+                target=self.__sampling_thread_handle, args=[thread_ident],
+                daemon=True)
+        self.__sampling_thread.start()
+
+    def stop_sampling(self) -> None:
+        if self.__sampling_thread is None:
+            return
+        self.__stop_event.set()
+        self.__sampling_thread.join()
+        self.__sampling_thread = None
+
+    def __prepare_functions(self) -> List[Dict[str, Any]]:
+        functions: Counter = Counter()
+        for stack in self.samples:
+            if len(stack) > 0:
+                functions[stack[-1]] += self.samples[stack]
+        return [{'function': function, 'samples': samples}
+                for function, samples in functions.most_common(50)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        ret_val: Dict[str, Any] = {}
+        ret_val['timestamp'] = datetime.now().isoformat()
+        ret_val['phases'] = [phase.to_dict() for phase in self.phases]
+        if self.sampling:
+            ret_val['sampling'] = {'interval_s': self.sampling_interval_s,
+                    'samples': self.samples_total,
+                    'functions': self.__prepare_functions(),
+                    'stacks': [{'stack': list(stack), 'samples': samples}
+                            for stack, samples in self.samples.most_common(50)]}
+        return ret_val
+
+    def write_report(self, file_path: str) -> None:
+        if not self.enabled:
+            return
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(self.to_dict(), indent=4))
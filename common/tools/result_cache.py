@@ -0,0 +1,64 @@
+from typing import Any, Dict, Iterable, List
+from datetime import datetime
+from enum import Enum
+import hashlib
+import json
+import os
+
+class result_cache:
+    def __init__(self, file_path: str) -> None:
+        self.file_path: str = file_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as file:
+                self.entries = json.loads(file.read())
+
+    @staticmethod
+    def __describe(value: Any, excluded_fields: List[str]) -> Any:
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, dict):
+            return [(str(key), result_cache.__describe(value=value[key],
+                    excluded_fields=excluded_fields))
+                    for key in sorted(value, key=str)]
+        if isinstance(value, (list, tuple)):
+            return [result_cache.__describe(value=item,
+                    excluded_fields=excluded_fields) for item in value]
+        if hasattr(value, '__dict__'):
+            fields = {key: field for key, field in vars(value).items()
+                    if not key in excluded_fields}
+            return (type(value).__name__, result_cache.__describe(value=fields,
+                    excluded_fields=excluded_fields))
+        return value
+
+    @staticmethod
+    def calculate_definitions_hash(definitions: Iterable[Any],
+            excluded_fields: List[str] = ['source']) -> str:
+        hasher = hashlib.sha256()
+        for definition in definitions:
+            hasher.update(repr(result_cache.__describe(value=definition,
+                    excluded_fields=excluded_fields)).encode())
+        return hasher.hexdigest()
+
+    @staticmethod
+    def prepare_key(spec_hash: str, definitions_hash: str, dut_info: str) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(repr((spec_hash, definitions_hash, dut_info)).encode())
+        return hasher.hexdigest()
+
+    def is_passed(self, xray_id: str, key: str) -> bool:
+        if not xray_id in self.entries:
+            return False
+        entry = self.entries[xray_id]
+        return entry['key'] == key and entry['status'] == True
+
+    def store(self, xray_id: str, key: str, status: bool) -> None:
+        self.entries[xray_id] = {'key': key, 'status': status,
+                'timestamp': datetime.now().isoformat()}
+        directory = os.path.dirname(self.file_path)
+        if directory != '' and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{self.file_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(self.entries, indent=4))
+        os.replace(temp_path, self.file_path)
@@ -0,0 +1,133 @@
+from typing import Any, Dict, List
+from datetime import datetime
+import threading
+import sqlite3
+import os
+
+class result_store:
+    __schema: List[str] = [
+        '''CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            xray_id TEXT NOT NULL,
+            name TEXT,
+            dut_serial TEXT,
+            dut_info TEXT,
+            started_at TEXT NOT NULL,
+            finished_at TEXT,
+            status INTEGER,
+            skipped INTEGER NOT NULL DEFAULT 0,
+            log_path TEXT,
+            log_file TEXT,
+            csv_file TEXT,
+            metrics_file TEXT,
+            profile_file TEXT)''',
+        '''CREATE TABLE IF NOT EXISTS steps (
+            run_id INTEGER NOT NULL REFERENCES runs(id),
+            step_number INTEGER NOT NULL,
+            action TEXT,
+            status INTEGER NOT NULL,
+            planned_ms REAL,
+            actual_ms REAL,
+            faults INTEGER NOT NULL)''',
+        '''CREATE TABLE IF NOT EXISTS faults (
+            run_id INTEGER NOT NULL REFERENCES runs(id),
+            step_number INTEGER NOT NULL,
+            message TEXT NOT NULL)''',
+        'CREATE INDEX IF NOT EXISTS runs_xray_id ON runs (xray_id)',
+        'CREATE INDEX IF NOT EXISTS runs_dut_serial ON runs (dut_serial)',
+        'CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at)',
+        'CREATE INDEX IF NOT EXISTS steps_run_id ON steps (run_id)',
+        'CREATE INDEX IF NOT EXISTS faults_run_id ON faults (run_id)']
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path: str = file_path
+        directory = os.path.dirname(file_path)
+        if directory != '' and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self.__lock: threading.Lock = threading.Lock()
+        self.__connection: sqlite3.Connection = sqlite3.connect(file_path,
+                check_same_thread=False)
+        self.__connection.row_factory = sqlite3.Row
+        with self.__lock, self.__connection:
+            for statement in result_store.__schema:
+                self.__connection.execute(statement)
+
+    def start_run(self, xray_id: str, name: str, dut_serial: str,
+            log_path: str, log_file: str, csv_file: str, metrics_file: str,
+            profile_file: str) -> int:
+        with self.__lock, self.__connection:
+            cursor = self.__connection.execute(
+                    'INSERT INTO runs (xray_id, name, dut_serial, started_at, ' +
+                    'log_path, log_file, csv_file, metrics_file, profile_file) ' +
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (xray_id, name, dut_serial, datetime.now().isoformat(),
+                    log_path, log_file, csv_file, metrics_file, profile_file))
+            return cursor.lastrowid
+
+    def add_step(self, run_id: int, step_number: int, action: str,
+            status: bool, planned_ms: float, actual_ms: float,
+            faults: List[str]) -> None:
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                    'INSERT INTO steps (run_id, step_number, action, status, ' +
+                    'planned_ms, actual_ms, faults) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (run_id, step_number, action, int(status), planned_ms,
+                    actual_ms, len(faults)))
+            self.__connection.executemany(
+                    'INSERT INTO faults (run_id, step_number, message) ' +
+                    'VALUES (?, ?, ?)',
+                    [(run_id, step_number, fault.strip()) for fault in faults])
+
+    def finish_run(self, run_id: int, status: bool, dut_info: str = None,
+            skipped: bool = False) -> None:
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                    'UPDATE runs SET finished_at = ?, status = ?, skipped = ?, ' +
+                    'dut_info = ? WHERE id = ?',
+                    (datetime.now().isoformat(), int(status), int(skipped),
+                    dut_info, run_id))
+
+    def find_runs(self, xray_id: str = None, dut_serial: str = None,
+            since: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        conditions: List[str] = []
+        parameters: List[Any] = []
+        if not xray_id is None:
+            conditions.append('xray_id = ?')
+            parameters.append(xray_id)
+        if not dut_serial is None:
+            conditions.append('dut_serial = ?')
+            parameters.append(dut_serial)
+        if not since is None:
+            conditions.append('started_at >= ?')
+            parameters.append(since)
+        query = 'SELECT * FROM runs'
+        if len(conditions) > 0:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY started_at DESC LIMIT ?'
+        parameters.append(limit)
+        with self.__lock:
+            return [dict(row) for row in
+                    self.__connection.execute(query, parameters)]
+
+    def find_flaky_specs(self, since: str = None) -> List[Dict[str, Any]]:
+        query = ('SELECT xray_id, COUNT(*) AS runs, SUM(status) AS passed ' +
+                'FROM runs WHERE finished_at IS NOT NULL AND skipped = 0')
+        parameters: List[Any] = []
+        if not since is None:
+            query += ' AND started_at >= ?'
+            parameters.append(since)
+        query += (' GROUP BY xray_id HAVING SUM(status) > 0 AND ' +
+                'SUM(status) < COUNT(*) ORDER BY runs DESC')
+        with self.__lock:
+            return [dict(row) for row in
+                    self.__connection.execute(query, parameters)]
+
+    def find_faults(self, run_id: int) -> List[Dict[str, Any]]:
+        with self.__lock:
+            return [dict(row) for row in self.__connection.execute(
+                    'SELECT step_number, message FROM faults WHERE run_id = ? ' +
+                    'ORDER BY step_number', (run_id,))]
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
@@ -0,0 +1,170 @@
+from typing import Any, Dict, List
+from datetime import datetime
+from enum import Enum
+import threading
+import bisect
+import time
+import json
+import os
+
+class runtime_metrics_format(Enum):
+    JSON_LINES = 'jsonl'
+    PROMETHEUS = 'prom'
+
+runtime_histogram_buckets_ms: List[float] = [0.1, 0.5, 1, 2.5, 5, 10, 25, 50,
+        100, 250, 500, 1000, 2500]
+
+class runtime_histogram:
+    def __init__(self, buckets_ms: List[float] = runtime_histogram_buckets_ms
+            ) -> None:
+        self.buckets_ms: List[float] = buckets_ms
+        self.counts: List[int] = [0] * len(buckets_ms)
+        self.count: int = 0
+        self.sum_ms: float = 0.0
+
+    def add(self, value_ms: float) -> None:
+        index = bisect.bisect_left(self.buckets_ms, value_ms)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+
+    def print(self, name: str, labels: Dict[str, str] = {}) -> str:
+        prefix = ''.join(f'{key}="{labels[key]}",' for key in labels)
+        ret_val = ''
+        cumulative = 0
+        for bucket_ms, count in zip(self.buckets_ms, self.counts):
+            cumulative += count
+            ret_val += f'{name}_bucket{{{prefix}le="{bucket_ms}"}} {cumulative}\n'
+        ret_val += f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}\n'
+        suffix = ''
+        if len(labels) > 0:
+            suffix = f'{{{prefix[:-1]}}}'
+        ret_val += f'{name}_sum{suffix} {self.sum_ms}\n'
+        ret_val += f'{name}_count{suffix} {self.count}\n'
+        return ret_val
+
+class runtime_metrics:
+    def __init__(self, file_path: str, period_s: float = 1.0,
+            format: runtime_metrics_format = runtime_metrics_format.JSON_LINES
+            ) -> None:
+        self.file_path: str = file_path
+        self.period_s: float = period_s
+        self.format: runtime_metrics_format = format
+        self.frames_total: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+        self.__frames: int = 0
+        self.__frame_latencies_ms: List[float] = []
+        self.__queue_depths: List[int] = []
+        self.__step_timings: List[Dict[str, float]] = []
+        self.__round_trips_ms: Dict[str, List[float]] = {}
+        self.__last_flush_ns: int = time.monotonic_ns()
+        self.__frame_latency_histogram: runtime_histogram = runtime_histogram()
+        self.__jitter_histogram: runtime_histogram = runtime_histogram()
+        self.__round_trip_histograms: Dict[str, runtime_histogram] = {}
+
+    @staticmethod
+    def __summarize(samples: List[float]) -> Dict[str, float]:
+        if len(samples) == 0:
+            return {'count': 0}
+        ordered = sorted(samples)
+        return {'count': len(ordered), 'mean': sum(ordered) / len(ordered),
+                'p50': ordered[len(ordered) // 2],
+                'p95': ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+                'max': ordered[-1]}
+
+    def add_frames(self, count: int, arrival_ns: int) -> None:
+        latency_ms = (time.monotonic_ns() - arrival_ns) / 1000000
+        with self.__lock:
+            self.__frames += count
+            self.frames_total += count
+            self.__frame_latencies_ms.append(latency_ms)
+            self.__frame_latency_histogram.add(value_ms=latency_ms)
+
+    def add_queue_depth(self, depth: int) -> None:
+        if depth is None:
+            return
+        with self.__lock:
+            self.__queue_depths.append(depth)
+
+    def add_step_timing(self, step_number: int, planned_ms: float,
+            actual_ms: float) -> None:
+        with self.__lock:
+            self.__step_timings.append({'step': step_number,
+                    'planned_ms': planned_ms, 'actual_ms': actual_ms,
+                    'jitter_ms': actual_ms - planned_ms})
+            self.__jitter_histogram.add(value_ms=actual_ms - planned_ms)
+
+    def add_round_trip(self, name: str, duration_ms: float) -> None:
+        with self.__lock:
+            if not name in self.__round_trips_ms:
+                self.__round_trips_ms[name] = []
+            self.__round_trips_ms[name].append(duration_ms)
+            if not name in self.__round_trip_histograms:
+                self.__round_trip_histograms[name] = runtime_histogram()
+            self.__round_trip_histograms[name].add(value_ms=duration_ms)
+
+    def __prepare_snapshot(self) -> Dict[str, Any]:
+        now_ns = time.monotonic_ns()
+        with self.__lock:
+            elapsed_s = (now_ns - self.__last_flush_ns) / 1000000000
+            ret_val: Dict[str, Any] = {}
+            ret_val['timestamp'] = datetime.now().isoformat()
+            ret_val['frames_total'] = self.frames_total
+            ret_val['frames_per_s'] = self.__frames / elapsed_s \
+                    if elapsed_s > 0 else 0.0
+            ret_val['queue_depth'] = {'last': None, 'max': None}
+            if len(self.__queue_depths) > 0:
+                ret_val['queue_depth'] = {'last': self.__queue_depths[-1],
+                        'max': max(self.__queue_depths)}
+            ret_val['frame_latency_ms'] = runtime_metrics.__summarize(
+                    samples=self.__frame_latencies_ms)
+            ret_val['steps'] = self.__step_timings
+            ret_val['round_trip_ms'] = {name: runtime_metrics.__summarize(
+                    samples=self.__round_trips_ms[name])
+                    for name in self.__round_trips_ms}
+            self.__frames = 0
+            self.__frame_latencies_ms = []
+            self.__queue_depths = []
+            self.__step_timings = []
+            self.__round_trips_ms = {}
+            self.__last_flush_ns = now_ns
+        return ret_val
+
+    def __prepare_prometheus(self, snapshot: Dict[str, Any]) -> str:
+        ret_val = ''
+        ret_val += f'pil_frames_total {snapshot["frames_total"]}\n'
+        ret_val += f'pil_frames_per_second {snapshot["frames_per_s"]}\n'
+        if not snapshot['queue_depth']['last'] is None:
+            ret_val += f'pil_feedbacks_queue_depth {snapshot["queue_depth"]["last"]}\n'
+            ret_val += f'pil_feedbacks_queue_depth_max {snapshot["queue_depth"]["max"]}\n'
+        with self.__lock:
+            ret_val += '# TYPE pil_frame_latency_ms histogram\n'
+            ret_val += self.__frame_latency_histogram.print(
+                    name='pil_frame_latency_ms')
+            ret_val += '# TYPE pil_step_start_jitter_ms histogram\n'
+            ret_val += self.__jitter_histogram.print(
+                    name='pil_step_start_jitter_ms')
+            if len(self.__round_trip_histograms) > 0:
+                ret_val += '# TYPE pil_round_trip_ms histogram\n'
+            for name in self.__round_trip_histograms:
+                ret_val += self.__round_trip_histograms[name].print(
+                        name='pil_round_trip_ms', labels={'call': name})
+        return ret_val
+
+    def flush(self) -> None:
+        snapshot = self.__prepare_snapshot()
+        directory = os.path.dirname(self.file_path)
+        if directory != '' and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        if self.format == runtime_metrics_format.PROMETHEUS:
+            with open(self.file_path, 'w', encoding='utf-8') as file:
+                file.write(self.__prepare_prometheus(snapshot=snapshot))
+        else:
+            with open(self.file_path, 'a', encoding='utf-8') as file:
+                file.write(f'{json.dumps(snapshot)}\n')
+
+    def flush_if_due(self) -> None:
+        if (time.monotonic_ns() - self.__last_flush_ns) / 1000000000 >= \
+                self.period_s:
+            self.flush()
@@ -1,4 +1,4 @@
-from typing import Any, List, Dict
+from typing import Any, Awaitable, Callable, Iterable, List, Dict, Set, Tuple
 from datetime import datetime
 import multiprocessing
 import threading
@@ -12,16 +12,29 @@ from common.adapters.adapter import adapter, adapter_type
 from common.adapters.adapter import can_worker_adapter
 from common.adapters.comm_adapter import comm_adapter
 from common.adapters.dut_adapter import dut_adapter
-from common.structures.a2l_file import a2l_file
+from common.adapters.sim_adapter import (sim_adapter, sim_dut_adapter, 
+        sim_adapter_type)
+from common.parsers.test_spec_parser import test_spec_parser
+from common.parsers.input_files_parser import input_files_parser
+from common.structures.a2l_file import a2l_file, a2l_signal
+from common.structures.test_spec_artifact import (test_spec_artifact, 
+        test_spec_artifact_extension)
 from common.structures.dbc_file import dbc_file, dbc_message
 from common.structures.test_spec import (test_spec, step, step_type, common_step,
-        special_step, special_step_action, signal, signal_source)
+        special_step, special_step_action, signal, signal_source, signal_form)
 from common.tools.type_conversion import str_to_type
 from common.tools.files import get_file
+from common.tools.runtime_metrics import runtime_metrics, runtime_metrics_format
+from common.tools.profiler import phase_profiler
+from common.tools.result_cache import result_cache
+from common.tools.result_store import result_store
+from common.tools.firmware_transfer import firmware_transfer
+from common.tools.dump_transfer import dump_transfer, dump_record, dump_index
 
 finish_event = threading.Event()
 error_event = threading.Event()
 new_step_event = threading.Event()
+monitoring_start_event = threading.Event()
 feedbacks_queue = multiprocessing.Queue()
 faults_queue = multiprocessing.Queue()
 
@@ -29,9 +42,33 @@ dbc_messages: Dict[str, dbc_message] = {}
 signals: Dict[str, signal] = {}
 logged_data: Dict[str, str] = {}
 a2l_signals: Dict[str, str] = {}
-active_sending_tasks: List[str] = []
+active_sending_tasks: Dict[Tuple[str, str, str], str] = {}
+calibration_pipeline_depth: int = 8
 reading_task_filters: List[Dict[str, Any]] = {}
 reading_task_dbc_to_can_map: List[Dict[str, Any]] = {}
+reading_task_interval_ms: float = None
+default_reading_task_interval_ms: float = 100
+min_reading_task_interval_ms: float = 10
+current_step: step = None
+current_step_start_ns: int = 0
+metrics: runtime_metrics = None
+profiler: phase_profiler = phase_profiler(enabled=False)
+results: result_cache = None
+scenario_error: Exception = None
+store: result_store = None
+store_run_id: int = None
+warm_start: bool = False
+dut_state_path: str = None
+dut_powered: bool = True
+expected_parameters: Dict[str, Any] = None
+calibrated_signals: Set[str] = set()
+differential_parameters: bool = False
+known_parameters: Dict[str, Dict[str, Any]] = {}
+current_step_number: int = 0
+dumps: dump_index = None
+dumps_prefix: str = None
+reference_period_ms: float = None
+default_reference_period_ms: float = 100
 
 def prepare_caption(data_dict: dict) -> str:
     caption: str = 'timestamp,'
@@ -45,6 +82,12 @@ def prepare_data(data_dict: dict) -> str:
         data += f'{data_dict[field]},'
     return f'{data}\n'   
 
+def get_queue_depth(queue: multiprocessing.Queue) -> int:
+    try:
+        return queue.qsize()
+    except NotImplementedError:
+        return None
+
 def process_message(step: step, message: Dict[str, Any], step_timestamp_ns: int):
     global logged_data
     message_name = message[4]['message_name']
@@ -55,7 +98,7 @@ def process_message(step: step, message: Dict[str, Any], step_timestamp_ns: int)
         if signal_name in step.monitored_signals:
             monitored_signal = step.monitored_signals[signal_name]
             range_index = None
-            time_from_start = (time.time_ns() - step_timestamp_ns) / 1000000
+            time_from_start = (time.monotonic_ns() - step_timestamp_ns) / 1000000
             for index, range in enumerate(monitored_signal.ranges):
                 if (time_from_start >= range.start_ms and 
                         time_from_start <= range.stop_ms):
@@ -77,120 +120,499 @@ def process_message(step: step, message: Dict[str, Any], step_timestamp_ns: int)
 
 def monitoring_thread_handle(spec: test_spec, log_path: str):
     global logged_data
+    while not monitoring_start_event.wait(0.01):
+        if finish_event.is_set() or error_event.is_set():
+            return
     log_file_name = f'{spec.xray_id}.csv'
     log_file = open(f'{log_path}/{log_file_name}', 'w')
-    step_cntr = 0
-    current_step = spec.initial_state
-    step_timestamp_ns = time.time_ns()
+    monitored_step = spec.initial_state
+    step_timestamp_ns = time.monotonic_ns()
+    profiler.start_sampling(thread_ident=threading.get_ident())
     while True:
         while not feedbacks_queue.empty():
-            messages = feedbacks_queue.get()
+            arrival_ns, messages = feedbacks_queue.get()
             for message in messages:
                 if len(message[4]) > 0:
-                    process_message(step=current_step, message=message, 
+                    process_message(step=monitored_step, message=message, 
                             step_timestamp_ns=step_timestamp_ns)
             log_file.write(f'{prepare_data(logged_data)}')
+            if not metrics is None:
+                metrics.add_frames(count=len(messages), arrival_ns=arrival_ns)
+                metrics.add_queue_depth(depth=get_queue_depth(
+                        queue=feedbacks_queue))
+        if not metrics is None:
+            metrics.flush_if_due()
 
         if new_step_event.wait(0.001) == True:
             new_step_event.clear()
-            step_timestamp_ns = time.time_ns()
-            if step_cntr < len(spec.steps):
-                current_step = spec.steps[step_cntr]
-            step_cntr += 1
+            monitored_step = current_step
+            step_timestamp_ns = current_step_start_ns
         if error_event.wait(0.001) == True:
             break
         if finish_event.wait(0.001) == True:
             break
 
+    profiler.stop_sampling()
+    profiler.start_phase(name='log finalization')
     log_file.close()
+    if not metrics is None:
+        metrics.flush()
     with open(f'{log_path}/{log_file_name}', 'r+') as log_file:
         content = log_file.read()
         log_file.seek(0, 0)
         log_file.write(prepare_caption(logged_data) + content)
+    profiler.stop_phase(name='log finalization')
 
 def read_feedbacks(messages: list) -> None:
-    feedbacks_queue.put(messages)
+    feedbacks_queue.put((time.monotonic_ns(), messages))
+
+class step_timing:
+    def __init__(self, step_number: int, planned_ms: float, 
+            actual_ms: float) -> None:
+        self.step_number: int = step_number
+        self.planned_ms: float = planned_ms
+        self.actual_ms: float = actual_ms
+
+class step_scheduler:
+    def __init__(self) -> None:
+        self.start_ns: int = 0
+        self.next_start_ns: int = 0
+        self.timings: List[step_timing] = []
+
+    @staticmethod
+    async def __sleep_until(deadline_ns: int) -> None:
+        delay_ns = deadline_ns - time.monotonic_ns()
+        if delay_ns > 0:
+            await asyncio.sleep(delay_ns / 1000000000)
+
+    def start(self) -> None:
+        self.start_ns = time.monotonic_ns()
+        self.next_start_ns = self.start_ns
+
+    async def begin_step(self, step_number: int, duration_ms: float) -> int:
+        planned_ns = self.next_start_ns
+        await step_scheduler.__sleep_until(deadline_ns=planned_ns)
+        actual_ns = time.monotonic_ns()
+        self.timings.append(step_timing(step_number=step_number, 
+                planned_ms=(planned_ns - self.start_ns) / 1000000, 
+                actual_ms=(actual_ns - self.start_ns) / 1000000))
+        self.next_start_ns = planned_ns + int(duration_ms * 1000000)
+        return actual_ns
+
+    async def end_step(self) -> None:
+        await step_scheduler.__sleep_until(deadline_ns=self.next_start_ns)
+
+class planned_sending_task:
+    def __init__(self, message: str, signals: Dict[str, float]) -> None:
+        self.message: str = message
+        self.signals: Dict[str, float] = signals
+        self.key: Tuple[str, str, str] = None
+        self.task: can_worker_adapter.sending_task = None
+
+    def prepare_task(self, can: str, da: str) -> can_worker_adapter.sending_task:
+        if self.task is None or self.key != (self.message, can, da):
+            self.key = (self.message, can, da)
+            self.task = can_worker_adapter.sending_task(
+                    message=dbc_messages[self.message], can=can, sa='FE', da=da)
+        return self.task
+
+class step_plan:
+    def __init__(self, step: step, action: Callable[..., Awaitable[None]], 
+            calibrations: List[Dict[str, Any]], 
+            sending_tasks: List[planned_sending_task]) -> None:
+        self.step: step = step
+        self.action: Callable[..., Awaitable[None]] = action
+        self.calibrations: List[Dict[str, Any]] = calibrations
+        self.sending_tasks: List[planned_sending_task] = sending_tasks
+
+def compile_step(step: step) -> step_plan:
+    if step.type == step_type.SPECIAL:
+        return step_plan(step=step, action=perform_special_step, 
+                calibrations=[], sending_tasks=[])
+    elif step.type != step_type.COMMON:
+        raise Exception(f'Test type ({step.type}) is not supported')
+    calibrations: List[Dict[str, Any]] = []
+    dbc_signals: Dict[str, Dict[str, float]] = {}
+    for signal in step.control_signals:
+        control_signal = step.control_signals[signal]
+        value = control_signal.calculate_reference(timestamp_ms=0.0)
+        if control_signal.signal.source_type == signal_source.DBC:
+            if not control_signal.signal.parent in dbc_signals:
+                dbc_signals[control_signal.signal.parent] = {}
+            dbc_signals[control_signal.signal.parent][
+                control_signal.signal.name] = value
+        elif control_signal.signal.source_type == signal_source.A2L:
+            calibrations.append({'definition': control_signal.signal.origin, 
+                    'value': value})
+        else:
+            raise Exception(f'{control_signal.signal.source} is not supported')
+    sending_tasks: List[planned_sending_task] = []
+    for message in dbc_signals:
+        if not message in dbc_messages:
+            raise Exception(f'Message {message} is missing in the DBC files')
+        sending_tasks.append(planned_sending_task(message=message, 
+                signals=dbc_signals[message]))
+    return step_plan(step=step, action=perform_common_step, 
+            calibrations=calibrations, sending_tasks=sending_tasks)
+
+def compile_execution_plan(spec: test_spec) -> Iterable[step_plan]:
+    def compile_steps() -> Iterable[step_plan]:
+        for index, step in enumerate(spec.steps):
+            try:
+                yield compile_step(step=step)
+            except Exception as e:
+                raise Exception(f'Failed to compile step {index + 1}: {e}')
+    plans = compile_steps()
+    if isinstance(spec.steps, list):
+        return list(plans)
+    return plans
+
+async def calibrate_signals(dut: dut_adapter, 
+        calibrations: List[Dict[str, Any]]) -> None:
+    if len(calibrations) == 0:
+        return
+    start_ns = time.monotonic_ns()
+    semaphore = asyncio.Semaphore(calibration_pipeline_depth)
+    async def calibrate_signal(calibration: Dict[str, Any]) -> None:
+        async with semaphore:
+            await dut.calibrate_signal(definition=calibration['definition'], 
+                    value=calibration['value'])
+    await asyncio.gather(*[calibrate_signal(calibration=calibration) 
+            for calibration in calibrations])
+    calibrated_signals.update(calibration['definition'].name 
+            for calibration in calibrations)
+    if not metrics is None:
+        metrics.add_round_trip(name='calibration', 
+                duration_ms=(time.monotonic_ns() - start_ns) / 1000000)
+
+def define_sending_address(dut: dut_adapter, 
+        e2e_gateway: dut_adapter = None) -> Tuple[str, str]:
+    if not e2e_gateway is None:
+        return e2e_gateway.dut_info.can, e2e_gateway.dut_info.j1939_sa
+    return dut.dut_info.can, dut.dut_info.j1939_sa
+
+async def start_sending_tasks(dut: dut_adapter, 
+        sending_tasks: List[planned_sending_task], 
+        e2e_protection: bool = False, e2e_gateway: dut_adapter = None) -> None:
+    global active_sending_tasks
+    if len(sending_tasks) == 0:
+        return
+    can, da = define_sending_address(dut=dut, e2e_gateway=e2e_gateway)
+    for sending_task in sending_tasks:
+        sending_task.prepare_task(can=can, da=da)
+    start_ns = time.monotonic_ns()
+    replaced_tasks: List[str] = [active_sending_tasks.pop(sending_task.key) 
+            for sending_task in sending_tasks 
+                    if sending_task.key in active_sending_tasks]
+    if len(replaced_tasks) > 0:
+        await dut.stop_sending_tasks(ids=replaced_tasks)
+    ids = await asyncio.gather(*[dut.start_sending_task(
+            task=sending_task.task, signals=sending_task.signals, 
+            e2e_protection=e2e_protection) for sending_task in sending_tasks])
+    for sending_task, id in zip(sending_tasks, ids):
+        active_sending_tasks[sending_task.key] = id
+    if not metrics is None:
+        metrics.add_round_trip(name='sending_task', 
+                duration_ms=(time.monotonic_ns() - start_ns) / 1000000)
+
+def remember_parameters(dut: dut_adapter, parameters: Dict[str, Any], 
+        merge: bool = False) -> None:
+    parameters = json.loads(json.dumps(parameters))
+    if merge and dut.serial_number in known_parameters:
+        known_parameters[dut.serial_number].update(parameters)
+    else:
+        known_parameters[dut.serial_number] = parameters
+
+def prepare_changed_parameters(dut: dut_adapter, 
+        parameters: Dict[str, Any]) -> Dict[str, Any]:
+    if not dut.serial_number in known_parameters:
+        return parameters
+    known = known_parameters[dut.serial_number]
+    requested = json.loads(json.dumps(parameters))
+    return {name: parameters[name] for name in parameters 
+            if not name in known or known[name] != requested[name]}
+
+async def update_parameters(dut: dut_adapter, parameters: Dict[str, Any], 
+        log_file: Any) -> None:
+    if not differential_parameters:
+        await dut.update_parameters(parameters=parameters)
+        return
+    changed = prepare_changed_parameters(dut=dut, parameters=parameters)
+    log_file.write(f'Parameters changed: {len(changed)} of {len(parameters)}\n')
+    if len(changed) == 0:
+        return
+    start_ns = time.monotonic_ns()
+    try:
+        await dut.update_parameters(parameters=changed)
+    except:
+        known_parameters.pop(dut.serial_number, None)
+        raise
+    remember_parameters(dut=dut, parameters=changed, merge=True)
+    if not metrics is None:
+        metrics.add_round_trip(name='parameters', 
+                duration_ms=(time.monotonic_ns() - start_ns) / 1000000)
+
+async def update_firmware(adapter: adapter, dut: dut_adapter, details: Any, 
+        log_file: Any) -> None:
+    def report_progress(sent_bytes: int, size: int) -> None:
+        log_file.write(f'Firmware update: {sent_bytes} of {size} bytes ' + 
+                f'({100 * sent_bytes / size:.0f}%)\n')
+    transfer = firmware_transfer.create_from_spec(dut=dut, spec=details, 
+            progress_callback=report_progress)
+    known_parameters.pop(dut.serial_number, None)
+    with profiler.phase(name='firmware update'):
+        report = await transfer.run()
+    log_file.write(f'Firmware update: {report.print()}\n')
+    if not metrics is None:
+        metrics.add_round_trip(name='firmware_update', 
+                duration_ms=report.duration_s * 1000)
+    await configure_reading_task(adapter=adapter, dut=dut)
+
+async def dump_memory(dut: dut_adapter, action: special_step_action, 
+        details: Any, log_file: Any) -> None:
+    if not isinstance(details, dict):
+        details = {}
+    if action == special_step_action.GET_FRAM:
+        name = 'fram'
+        read_block = getattr(dut, 'read_fram_block', None)
+        get_size = getattr(dut, 'get_fram_size', None)
+    else:
+        name = 'report'
+        read_block = getattr(dut, 'read_report_block', None)
+        get_size = getattr(dut, 'get_report_size', None)
+    if read_block is None or get_size is None:
+        raise Exception(f'{action.name} needs chunked reads, but ' +
+                f'{type(dut).__name__} does not provide read_{name}_block ' +
+                f'and get_{name}_size')
+    file_path = f'{dumps_prefix}.step{current_step_number}.{name}.bin'
+    with profiler.phase(name=f'{name} dump'):
+        size = await get_size()
+        transfer = dump_transfer(
+                read_block=read_block, size=size, file_path=file_path, 
+                chunk_size=details.get('chunk_size', 0x1000), 
+                window=details.get('window', 8), 
+                retries=details.get('retries', 3))
+        duration_s = await transfer.run()
+    record = dump_record(step_number=current_step_number, action=action.name, 
+            file_path=os.path.basename(file_path), size=size, 
+            duration_s=duration_s)
+    dumps.add(record=record)
+    log_file.write(f'Dump: {record.print()}\n')
+    if not metrics is None:
+        metrics.add_round_trip(name=f'{name}_dump', duration_ms=duration_s * 1000)
 
 async def perform_special_step(adapter: adapter, dut: dut_adapter, 
-        step: special_step, log_file: Any, e2e_protection: bool = False, 
+        plan: step_plan, log_file: Any, e2e_protection: bool = False, 
         e2e_gateway: dut_adapter = None) -> None:
+    global dut_powered
+    step: special_step = plan.step
     if step.step_action == special_step_action.REBOOT:
         await dut.reboot()
+        dut_powered = True
         await configure_reading_task(adapter=adapter, dut=dut)
     elif step.step_action == special_step_action.POWER_OFF:
         await dut.power_off()
+        dut_powered = False
     elif step.step_action == special_step_action.POWER_ON:
         await dut.power_on()
+        dut_powered = True
     elif step.step_action == special_step_action.GET_INFO:
         log_file.write(f'{dut.dut_info.print()}\n')
     elif step.step_action == special_step_action.GET_PARAMETERS:
-        log_file.write(json.dumps(await dut.get_parameters()))
+        parameters = await dut.get_parameters()
+        remember_parameters(dut=dut, parameters=parameters)
+        log_file.write(json.dumps(parameters))
     elif step.step_action == special_step_action.UPDATE_PARAMETERS:
-        await dut.update_parameters(parameters=step.action_details)
+        await update_parameters(dut=dut, parameters=step.action_details, 
+                log_file=log_file)
+    elif step.step_action == special_step_action.UPDATE_FIRMWARE:
+        await update_firmware(adapter=adapter, dut=dut, 
+                details=step.action_details, log_file=log_file)
+    elif step.step_action == special_step_action.GET_REPORT:
+        await dump_memory(dut=dut, action=step.step_action, 
+                details=step.action_details, log_file=log_file)
     elif step.step_action == special_step_action.GET_FRAM:
-        await dut.read_fram()
+        await dump_memory(dut=dut, action=step.step_action, 
+                details=step.action_details, log_file=log_file)
     else:
         raise Exception(f'{step.step_action} is not implemented yet')
 
 async def perform_common_step(adapter: adapter, dut: dut_adapter, 
-        step: common_step, log_file: Any, e2e_protection: bool = False, 
+        plan: step_plan, log_file: Any, e2e_protection: bool = False, 
         e2e_gateway: dut_adapter = None) -> None:
-    global active_sending_tasks
-    dbc_signals = {}
-    for signal in step.control_signals:
+    await calibrate_signals(dut=dut, calibrations=plan.calibrations)
+    await start_sending_tasks(dut=dut, sending_tasks=plan.sending_tasks, 
+            e2e_protection=e2e_protection, e2e_gateway=e2e_gateway)
+    await stream_references(dut=dut, plan=plan, log_file=log_file, 
+            e2e_protection=e2e_protection, e2e_gateway=e2e_gateway)
+
+async def stream_references(dut: dut_adapter, plan: step_plan, log_file: Any, 
+        e2e_protection: bool = False, e2e_gateway: dut_adapter = None) -> None:
+    if reference_period_ms <= 0:
+        return
+    step: common_step = plan.step
+    streamed = [signal for signal in step.control_signals 
+            if step.control_signals[signal].form == signal_form.TABLE]
+    if len(streamed) == 0:
+        return
+    ticks_ms: List[float] = []
+    tick_ms = reference_period_ms
+    while tick_ms < step.duration_ms:
+        ticks_ms.append(tick_ms)
+        tick_ms += reference_period_ms
+    if len(ticks_ms) == 0:
+        return
+    references = {signal: step.control_signals[signal].calculate_references(
+            timestamps_ms=ticks_ms) for signal in streamed}
+    a2l_references: Dict[str, List[float]] = {}
+    a2l_definitions: List[a2l_signal] = []
+    dbc_references: Dict[str, Dict[str, List[float]]] = {}
+    for signal in streamed:
         control_signal = step.control_signals[signal]
-        value = control_signal.calculate_reference(timestamp_ms=0.0)
         if control_signal.signal.source_type == signal_source.DBC:
-            if not control_signal.signal.parent in dbc_signals:
-                dbc_signals[control_signal.signal.parent] = {}
-            dbc_signals[control_signal.signal.parent][
-                control_signal.signal.name] = value
-        elif control_signal.signal.source_type == signal_source.A2L:
-            await dut.calibrate_signal(definition=control_signal.signal.origin, 
-                    value=value)
+            if not control_signal.signal.parent in dbc_references:
+                dbc_references[control_signal.signal.parent] = {}
+            dbc_references[control_signal.signal.parent][
+                control_signal.signal.name] = references[signal]
         else:
-            raise Exception(f'{control_signal.signal.source} is not supported')
-    for message in dbc_signals:
-        signals = dbc_signals[message]
-        can = dut.dut_info.can
-        da = dut.dut_info.j1939_sa
-        if not e2e_gateway is None:
-            can = e2e_gateway.dut_info.can
-            da = e2e_gateway.dut_info.j1939_sa
-        sending_task = can_worker_adapter.sending_task(
-                message=dbc_messages[message], can=can, sa='FE', da=da)
-        id = await dut.start_sending_task(task=sending_task, signals=signals, 
-                e2e_protection=e2e_protection)
-        if not id in active_sending_tasks:
-            active_sending_tasks.append(id)
-
-async def perform_step(adapter: adapter, dut: dut_adapter, step: step, 
-        log_file: Any, step_number: int, e2e_protection: bool = False, 
-        e2e_gateway: dut_adapter = None) -> bool:
+            a2l_references[control_signal.signal.name] = references[signal]
+            a2l_definitions.append(control_signal.signal.origin)
+    streamed_tasks = [sending_task for sending_task in plan.sending_tasks 
+            if sending_task.message in dbc_references]
+    tick_calibrations: List[List[Dict[str, Any]]] = []
+    tick_sending_tasks: List[List[planned_sending_task]] = []
+    for index in range(len(ticks_ms)):
+        tick_calibrations.append([{'definition': definition, 
+                'value': a2l_references[definition.name][index]} 
+                        for definition in a2l_definitions])
+        sending_tasks: List[planned_sending_task] = []
+        for sending_task in streamed_tasks:
+            signals = dict(sending_task.signals)
+            message_references = dbc_references[sending_task.message]
+            for signal_name in message_references:
+                signals[signal_name] = message_references[signal_name][index]
+            sending_tasks.append(planned_sending_task(
+                    message=sending_task.message, signals=signals))
+        tick_sending_tasks.append(sending_tasks)
+    skipped_ticks = 0
+    for index, tick_ms in enumerate(ticks_ms):
+        delay_ns = current_step_start_ns + int(tick_ms * 1000000) - \
+                time.monotonic_ns()
+        if delay_ns > 0:
+            await asyncio.sleep(delay_ns / 1000000000)
+        if (index + 1 < len(ticks_ms) and time.monotonic_ns() >= 
+                current_step_start_ns + int(ticks_ms[index + 1] * 1000000)):
+            skipped_ticks += 1
+            continue
+        await calibrate_signals(dut=dut, calibrations=tick_calibrations[index])
+        await start_sending_tasks(dut=dut, 
+                sending_tasks=tick_sending_tasks[index], 
+                e2e_protection=e2e_protection, e2e_gateway=e2e_gateway)
+    log_file.write(f'References streamed: {len(ticks_ms) - skipped_ticks} ' + 
+            f'of {len(ticks_ms)} updates\n')
+
+async def perform_step(adapter: adapter, dut: dut_adapter, plan: step_plan, 
+        log_file: Any, step_number: int, scheduler: step_scheduler, 
+        e2e_protection: bool = False, e2e_gateway: dut_adapter = None) -> bool:
+    global current_step
+    global current_step_start_ns
+    global current_step_number
     step_status = True
-    action = step.action
-    log_file.write(f'Step {step_number}: {step.action}\n')
-    step_action = None
-    if step.type == step_type.COMMON:
-        step_action = perform_common_step
-    elif step.type == step_type.SPECIAL:
-        step_action = perform_special_step
-    else:
-        raise Exception(f'Test type ({step.type}) is not supported')
-    asyncio.gather(
-        await step_action(adapter=adapter, dut=dut, step=step, log_file=log_file, 
-                e2e_protection=e2e_protection, e2e_gateway=e2e_gateway),
-        await asyncio.sleep(step.duration_ms / 1000)
-    )    
+    current_step_number = step_number
+    log_file.write(f'Step {step_number}: {plan.step.action}\n')
+    current_step_start_ns = await scheduler.begin_step(step_number=step_number, 
+            duration_ms=plan.step.duration_ms)
+    current_step = plan.step
+    new_step_event.set()
+    with profiler.phase(name=f'step {step_number}'):
+        try:
+            await plan.action(adapter=adapter, dut=dut, plan=plan, 
+                    log_file=log_file, e2e_protection=e2e_protection, 
+                    e2e_gateway=e2e_gateway)
+        except Exception as e:
+            log_file.write(f'Step failed: {e}\n')
+            raise Exception(f'Step {step_number} failed: {e}')
+        await scheduler.end_step()
+    timing = scheduler.timings[-1]
+    if not metrics is None:
+        metrics.add_step_timing(step_number=step_number, 
+                planned_ms=timing.planned_ms, actual_ms=timing.actual_ms)
+    log_file.write(f'Step start: planned {timing.planned_ms:.3f} ms, ' + 
+            f'actual {timing.actual_ms:.3f} ms\n')
+    faults: List[str] = []
     while not faults_queue.empty():
         step_status = False
-        log_file.write(faults_queue.get())
+        faults.append(faults_queue.get())
+        log_file.write(faults[-1])
     log_file.write(f'Step status: {step_status}\n')
+    if not store is None:
+        store.add_step(run_id=store_run_id, step_number=step_number, 
+                action=str(plan.step.action), status=step_status, 
+                planned_ms=timing.planned_ms, actual_ms=timing.actual_ms, 
+                faults=faults)
     return step_status
 
+def load_dut_state(file_path: str) -> Dict[str, Any]:
+    if file_path is None or not os.path.exists(file_path):
+        return None
+    with open(file_path, 'r', encoding='utf-8') as file:
+        ret_val = json.loads(file.read())
+    os.remove(file_path)
+    return ret_val
+
+async def save_dut_state(dut: dut_adapter, file_path: str) -> None:
+    state: Dict[str, Any] = {}
+    state['dut_info'] = dut.dut_info.print()
+    state['parameters'] = await dut.get_parameters()
+    state['calibrated_signals'] = sorted(calibrated_signals)
+    temp_path = f'{file_path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        file.write(json.dumps(state, indent=4))
+    os.replace(temp_path, file_path)
+
+async def verify_dut_state(adapter: adapter, dut: dut_adapter, 
+        initial_state: step_plan, state: Dict[str, Any], 
+        e2e_gateway: dut_adapter = None) -> str:
+    if state is None:
+        return 'no state was recorded by the previous run'
+    if state['dut_info'] != dut.dut_info.print():
+        return 'DUT info or firmware version changed'
+    addresses = [dut.dut_info.j1939_sa]
+    if not e2e_gateway is None:
+        addresses.append(e2e_gateway.dut_info.j1939_sa)
+    for task in await adapter.get_sending_tasks():
+        if 'da' in task and task['da'] in addresses:
+            return 'sending tasks are still running'
+    expected = state['parameters']
+    if not expected_parameters is None:
+        expected = expected_parameters
+    parameters = json.loads(json.dumps(await dut.get_parameters()))
+    remember_parameters(dut=dut, parameters=parameters)
+    for name in expected:
+        if not name in parameters or parameters[name] != expected[name]:
+            return f'parameter {name} differs from the expected value'
+    reset_signals = {calibration['definition'].name 
+            for calibration in initial_state.calibrations}
+    for signal_name in state['calibrated_signals']:
+        if not signal_name in reset_signals:
+            return f'calibration of {signal_name} is not reset by the ' + \
+                    'initial state'
+    return None
+
 async def set_initial_state(adapter: adapter, dut: dut_adapter, 
-        initial_state: common_step, log_file: Any, e2e_protection: bool = False,
+        initial_state: step_plan, log_file: Any, e2e_protection: bool = False,
         e2e_gateway: dut_adapter = None) -> None:
+    reboot_reason = None
+    if warm_start:
+        with profiler.phase(name='state verification'):
+            reboot_reason = await verify_dut_state(adapter=adapter, dut=dut, 
+                    initial_state=initial_state, 
+                    state=load_dut_state(file_path=dut_state_path), 
+                    e2e_gateway=e2e_gateway)
+        if reboot_reason is None:
+            log_file.write('Warm start: DUT state is verified, reboot skipped\n')
+        else:
+            log_file.write(f'Warm start: {reboot_reason}, rebooting\n')
     tasks: List[Dict[str, str]] = await adapter.get_sending_tasks()
     tasks_to_stop: List[str] = []
     for task in tasks:
@@ -201,91 +623,212 @@ async def set_initial_state(adapter: adapter, dut: dut_adapter,
                 tasks_to_stop.append(task['id'])
     if len(tasks_to_stop) > 0:
         await adapter.stop_sending_tasks(sending_tasks_ids=tasks_to_stop)
-    await dut.reboot()
-    await perform_step(adapter=adapter, dut=dut, step=initial_state, 
-            log_file=log_file, step_number=0, e2e_protection=e2e_protection, 
-            e2e_gateway=e2e_gateway)  
+    active_sending_tasks.clear()
+    if not warm_start or not reboot_reason is None:
+        with profiler.phase(name='reboot'):
+            await dut.reboot()
+    scheduler = step_scheduler()
+    scheduler.start()
+    await perform_step(adapter=adapter, dut=dut, plan=initial_state, 
+            log_file=log_file, step_number=0, scheduler=scheduler, 
+            e2e_protection=e2e_protection, e2e_gateway=e2e_gateway)  
+
+def narrow_reading_filter(filters: List[Dict[str, Any]], 
+        messages: List[str]) -> List[Dict[str, Any]]:
+    if len(messages) == 0:
+        return filters
+    ids = {dbc_messages[message].id for message in messages 
+            if message in dbc_messages}
+    ret_val: List[Dict[str, Any]] = []
+    for filter in filters:
+        if 'message' in filter:
+            if filter['message'] in messages:
+                ret_val.append(filter)
+        elif 'id' in filter:
+            if filter['id'] in ids:
+                ret_val.append(filter)
+        else:
+            ret_val.append(filter)
+    return ret_val
+
+def define_reading_interval(spec: test_spec, messages: List[str]) -> float:
+    if not spec.reading_interval_ms is None:
+        return spec.reading_interval_ms
+    periods = [dbc_messages[message].period_ms for message in messages 
+            if message in dbc_messages and 
+                    not dbc_messages[message].period_ms is None]
+    if len(periods) == 0:
+        return default_reading_task_interval_ms
+    return min(max(float(min(periods)), min_reading_task_interval_ms), 
+            default_reading_task_interval_ms)
 
 async def configure_reading_task(adapter: adapter, dut: dut_adapter, 
-        dbc_paths: List[str] = None, first_call: bool = False) -> None:
+        dbc_paths: List[str] = None, spec: test_spec = None, 
+        first_call: bool = False) -> None:
+    global reading_task_filters
+    global reading_task_dbc_to_can_map
+    global reading_task_interval_ms
     if first_call:
         for dbc_path in dbc_paths:
             await adapter.upload_dbc(dbc_path=dbc_path) 
-        global reading_task_filters
-        global reading_task_dbc_to_can_map
-        reading_task_filters = dut.prepare_reading_filter(dbc_files=dbc_paths)
+        messages = spec.prepare_list_of_observed_messages()
+        reading_task_filters = narrow_reading_filter(
+                filters=dut.prepare_reading_filter(dbc_files=dbc_paths), 
+                messages=messages)
         reading_task_dbc_to_can_map = dut.prepare_dbc_to_can_map(
                 dbc_files=dbc_paths)
-    await adapter.start_read_can_messages(callback=read_feedbacks, interval_ms=100, 
-            filters=reading_task_filters, dbc_to_can=reading_task_dbc_to_can_map)
+        reading_task_interval_ms = define_reading_interval(spec=spec, 
+                messages=messages)
+    await adapter.start_read_can_messages(callback=read_feedbacks, 
+            interval_ms=reading_task_interval_ms, filters=reading_task_filters, 
+            dbc_to_can=reading_task_dbc_to_can_map)
+
+def prepare_result_key(spec: test_spec, dut: dut_adapter) -> str:
+    definitions: List[Any] = []
+    for signal_name in sorted(set(spec.used_signals)):
+        origin = signals[signal_name].origin
+        definitions.append(origin)
+        if (signals[signal_name].source_type == signal_source.DBC and 
+                origin.parent in dbc_messages):
+            definitions.append(dbc_messages[origin.parent])
+    return result_cache.prepare_key(spec_hash=spec.calculate_hash(), 
+            definitions_hash=result_cache.calculate_definitions_hash(
+                    definitions=definitions), 
+            dut_info=dut.dut_info.print())
 
 async def test_scenario_thread_handle(adapter: adapter, dut: dut_adapter, 
-        spec: test_spec, dbc_paths: str, log_path: str, 
-        e2e_protection: bool = False, e2e_gateway: dut_adapter = None) -> None:
+        spec: test_spec, initial_plan: step_plan, plans: Iterable[step_plan], 
+        dbc_paths: str, log_path: str, e2e_protection: bool = False, 
+        e2e_gateway: dut_adapter = None) -> None:
+    global dumps
+    global dumps_prefix
     test_status = True
+    profiler.start_phase(name='adapter connection')
     async with adapter:
+        profiler.stop_phase(name='adapter connection')
+        profiler.start_phase(name='DUT connection')
         async with dut:
             if not e2e_gateway is None:
                 await e2e_gateway.set_connection()
+            profiler.stop_phase(name='DUT connection')
             if not os.path.exists(log_path):
                 os.mkdir(log_path)
+
+            result_key = None
+            if not results is None:
+                result_key = prepare_result_key(spec=spec, dut=dut)
+                if results.is_passed(xray_id=spec.xray_id, key=result_key):
+                    with open(f'{log_path}/{spec.xray_id}.log', 'a') as log_file:
+                        log_file.write(f'\n{datetime.now().isoformat()} ' + 
+                                'Test skipped: the spec, its signal ' + 
+                                'definitions and the DUT are unchanged since ' + 
+                                'the last passing run\n')
+                    if not store is None:
+                        store.finish_run(run_id=store_run_id, 
+                                status=test_status, 
+                                dut_info=dut.dut_info.print(), skipped=True)
+                    finish_event.set()
+                    return
+
             log_file = open(f'{log_path}/{spec.xray_id}.log', 'w')
+            dumps_prefix = f'{log_path}/{spec.xray_id}'
+            dumps = dump_index(file_path=f'{dumps_prefix}.dumps.jsonl')
             log_file.write(f'Test ID: {spec.xray_id}\n')
             log_file.write(f'Test name: {spec.name}\n')
             log_file.write(f'Test description: {spec.dscr}\n')
             log_file.write(f'\nDUT info: {dut.dut_info.print()}\n\n')
+            monitoring_start_event.set()
+
+            with profiler.phase(name='set_initial_state'):
+                await set_initial_state(adapter=adapter, dut=dut, 
+                        initial_state=initial_plan, log_file=log_file, 
+                        e2e_protection=e2e_protection, e2e_gateway=e2e_gateway)
+            with profiler.phase(name='reading task configuration'):
+                await configure_reading_task(adapter=adapter, dut=dut, 
+                        dbc_paths=dbc_paths, spec=spec, first_call=True)
             
-            await set_initial_state(adapter=adapter, dut=dut, 
-                    initial_state=spec.initial_state, log_file=log_file, 
-                    e2e_protection=e2e_protection, e2e_gateway=e2e_gateway)
-            new_step_event.set()
-            await configure_reading_task(adapter=adapter, dut=dut, 
-                    dbc_paths=dbc_paths, first_call=True)
-            
-            for index, step in enumerate(spec.steps):
-                if not await perform_step(adapter=adapter, dut=dut, step=step, 
+            scheduler = step_scheduler()
+            scheduler.start()
+            for index, plan in enumerate(plans):
+                if not await perform_step(adapter=adapter, dut=dut, plan=plan, 
                         log_file=log_file, step_number=(index + 1), 
-                        e2e_protection=e2e_protection, e2e_gateway=e2e_gateway):
+                        scheduler=scheduler, e2e_protection=e2e_protection, 
+                        e2e_gateway=e2e_gateway):
                     test_status = False
-                new_step_event.set()
 
+            await dut.stop_sending_tasks(ids=list(active_sending_tasks.values()))
+            active_sending_tasks.clear()
+            if warm_start:
+                if not test_status:
+                    log_file.write('\nWarm start: DUT state is not saved, ' + 
+                            'the test failed\n')
+                elif not dut_powered:
+                    log_file.write('\nWarm start: DUT state is not saved, ' + 
+                            'the DUT is powered off\n')
+                else:
+                    try:
+                        await save_dut_state(dut=dut, file_path=dut_state_path)
+                    except Exception as e:
+                        log_file.write('\nWarm start: failed to save the DUT ' + 
+                                f'state: {e}\n')
             log_file.write(f'\nTest status: {test_status}\n')
             log_file.close()
+            if not results is None:
+                results.store(xray_id=spec.xray_id, key=result_key, 
+                        status=test_status)
+            if not store is None:
+                store.finish_run(run_id=store_run_id, status=test_status, 
+                        dut_info=dut.dut_info.print())
             finish_event.set()
-            await dut.stop_sending_tasks(ids=active_sending_tasks)
 
 def start_test_scenario_thread(adapter: adapter, dut: dut_adapter, spec: test_spec,
+        initial_plan: step_plan, plans: Iterable[step_plan], 
         dbc_paths: List[str], log_path: str, e2e_protection: bool = False, 
         e2e_gateway: dut_adapter = None) -> None:
-    asyncio.run(test_scenario_thread_handle(adapter=adapter, dut=dut, spec=spec, 
-            dbc_paths=dbc_paths, log_path=log_path, e2e_protection=e2e_protection, 
-            e2e_gateway=e2e_gateway))
+    global scenario_error
+    try:
+        asyncio.run(test_scenario_thread_handle(adapter=adapter, dut=dut, 
+                spec=spec, initial_plan=initial_plan, plans=plans, 
+                dbc_paths=dbc_paths, log_path=log_path, 
+                e2e_protection=e2e_protection, e2e_gateway=e2e_gateway))
+    except Exception as e:
+        scenario_error = e
+        error_event.set()
 
-def run_test_spec(args: argparse.Namespace) -> None:
+def load_input_files(args: argparse.Namespace
+        ) -> Tuple[a2l_file, List[dbc_file], List[str]]:
     global dbc_messages
     a2l: a2l_file = None
     dbcs: List[dbc_file] = []
     dbc_paths: List[str] = []
+    errors: List[str] = []
+    a2l_path = None
     try:
         a2l_path = get_file(file_path=args.a2l_file)
-        a2l = a2l_file(a2l_file_path=a2l_path)
-        paths = args.dbc_files.split(',')
-        for path in paths:
-            dbc_path = get_file(file_path=path)
-            dbc_paths.append(dbc_path)
-            file = dbc_file(dbc_file_path=dbc_path)
-            dbcs.append(file)
-            dbc_messages = {**dbc_messages, **file.dbc_messages}
-    except:
-        raise Exception(f'Failed to parse the input files')
+    except Exception as e:
+        errors.append(f'{args.a2l_file}: {type(e).__name__}: {e}')
+    for path in args.dbc_files.split(','):
+        try:
+            dbc_paths.append(get_file(file_path=path))
+        except Exception as e:
+            errors.append(f'{path}: {type(e).__name__}: {e}')
+    if len(errors) > 0:
+        raise Exception('Failed to get the input files:\n' + '\n'.join(errors))
+    parser = input_files_parser(workers=getattr(args, 'parse_workers', None))
+    with profiler.phase(name='input files parsing'):
+        a2l, dbcs = parser.parse(a2l_path=a2l_path, dbc_paths=dbc_paths)
+    for file_path in parser.durations_s:
+        profiler.add_phase(name=f'parsing {os.path.basename(file_path)}', 
+                thread='parser', wall_s=parser.durations_s[file_path])
+    for file in dbcs:
+        dbc_messages = {**dbc_messages, **file.dbc_messages}
+    return a2l, dbcs, dbc_paths
 
-    global signals
-    spec: test_spec = None
-    try:
-        spec_path = get_file(file_path=args.test_spec)
-        with open(spec_path, 'r', encoding='utf-8') as file:
-            spec_json = json.loads(file.read())
-        for signal_name in spec_json['used_signals']:
+def resolve_signals(signal_names: List[str], a2l: a2l_file, 
+        dbcs: List[dbc_file]) -> Dict[str, Any]:
+    ret_val: Dict[str, Any] = {}
+    with profiler.phase(name='signal resolution'):
+        for signal_name in signal_names:
             signal = None
             if signal_name.startswith('a2l_'):
                 signal = a2l.find_signal_from_spec(signal_name=signal_name)
@@ -296,15 +839,175 @@ def run_test_spec(args: argparse.Namespace) -> None:
                         break
             if signal is None:
                 raise Exception(f'Failed to find the signal {signal_name}')
-            signals[signal_name] = signal.convert_to_test_spec_signal()
-        spec = test_spec.create_from_spec(spec=spec_json, signals=signals)
+            ret_val[signal_name] = signal
+    return ret_val
+
+def load_test_spec(args: argparse.Namespace, a2l: a2l_file, 
+        dbcs: List[dbc_file]) -> test_spec:
+    global signals
+    spec: test_spec = None
+    try:
+        spec_path = get_file(file_path=args.test_spec)
+        lazy_spec = getattr(args, 'lazy_spec', False)
+        with profiler.phase(name='spec reading'):
+            if lazy_spec:
+                spec_header = test_spec_parser.parse_header(spec_path=spec_path)
+                spec_json = spec_header.fields
+            else:
+                with open(spec_path, 'r', encoding='utf-8') as file:
+                    spec_json = json.loads(file.read())
+        definitions = resolve_signals(signal_names=spec_json['used_signals'], 
+                a2l=a2l, dbcs=dbcs)
+        for signal_name in definitions:
+            signals[signal_name] = \
+                    definitions[signal_name].convert_to_test_spec_signal()
+        with profiler.phase(name='spec building'):
+            if lazy_spec:
+                spec = test_spec_parser.create_test_spec(header=spec_header, 
+                        signals=signals)
+            else:
+                spec = test_spec.create_from_spec(spec=spec_json, 
+                        signals=signals, 
+                        base_path=os.path.dirname(os.path.abspath(spec_path)))
+    except Exception as e:
+        raise Exception(f'Failed to parse the test spec {args.test_spec}: {e}')
+    return spec
+
+def load_test_spec_artifact(args: argparse.Namespace
+        ) -> Tuple[test_spec, List[str]]:
+    global dbc_messages
+    global signals
+    try:
+        with profiler.phase(name='artifact loading'):
+            artifact = test_spec_artifact.load(
+                    file_path=get_file(file_path=args.test_spec))
+        stale_sources = artifact.find_stale_sources()
+    except Exception as e:
+        raise Exception('Failed to load the compiled test spec ' + 
+                f'{args.test_spec}: {e}')
+    if len(stale_sources) > 0:
+        raise Exception(f'The compiled test spec {args.test_spec} is stale, ' + 
+                f'changed or missing sources: {", ".join(stale_sources)}')
+    try:
+        dbc_messages = {**dbc_messages, **artifact.dbc_messages}
+        signals = {**signals, **artifact.prepare_test_spec_signals()}
+        with profiler.phase(name='spec building'):
+            spec = test_spec.create_from_spec(spec=artifact.spec, 
+                    signals=signals, base_path=artifact.base_path)
+        dbc_paths = artifact.dbc_paths
+        if not getattr(args, 'dbc_files', None) is None:
+            dbc_paths = [get_file(file_path=path) 
+                    for path in args.dbc_files.split(',')]
     except:
         raise Exception(f'Failed to parse the test spec {args.test_spec}')
+    return spec, dbc_paths
+
+def compile_test_spec(args: argparse.Namespace) -> str:
+    a2l, dbcs, dbc_paths = load_input_files(args=args)
+    try:
+        spec_path = get_file(file_path=args.test_spec)
+        with open(spec_path, 'r', encoding='utf-8') as file:
+            spec_json = json.loads(file.read())
+        definitions = resolve_signals(signal_names=spec_json['used_signals'], 
+                a2l=a2l, dbcs=dbcs)
+        base_path = os.path.dirname(os.path.abspath(spec_path))
+        test_spec.create_from_spec(spec=spec_json, signals={name: 
+                definitions[name].convert_to_test_spec_signal() 
+                for name in definitions}, base_path=base_path)
+    except:
+        raise Exception(f'Failed to parse the test spec {args.test_spec}')
+    artifact = test_spec_artifact.create_from_sources(spec=spec_json, 
+            signals=definitions, dbc_messages=dbc_messages, dbc_paths=dbc_paths, 
+            source_paths=[spec_path, a2l.a2l_file_path, *dbc_paths], 
+            base_path=base_path)
+    artifact_path = getattr(args, 'output', None)
+    if artifact_path is None:
+        artifact_path = os.path.splitext(spec_path)[0] + \
+                test_spec_artifact_extension
+    artifact.save(file_path=artifact_path)
+    return artifact_path
+
+def run_test_spec(args: argparse.Namespace) -> None:
+    global profiler
+    global scenario_error
+    scenario_error = None
+    profiler = phase_profiler(enabled=getattr(args, 'profile', False), 
+            sampling=getattr(args, 'profile_sampling', False))
+
+    spec: test_spec = None
+    dbc_paths: List[str] = []
+    if args.test_spec.endswith(test_spec_artifact_extension):
+        spec, dbc_paths = load_test_spec_artifact(args=args)
+    else:
+        a2l, dbcs, dbc_paths = load_input_files(args=args)
+        spec = load_test_spec(args=args, a2l=a2l, dbcs=dbcs)
+
+    with profiler.phase(name='plan compilation'):
+        try:
+            initial_plan = compile_step(step=spec.initial_state)
+        except Exception as e:
+            raise Exception(f'Failed to compile the initial state: {e}')
+        plans = compile_execution_plan(spec=spec)
+
+    global results
+    results = None
+    if getattr(args, 'incremental', False):
+        cache_path = getattr(args, 'result_cache', None)
+        if cache_path is None:
+            cache_path = f'{args.log_path}/result_cache.json'
+        results = result_cache(file_path=cache_path)
+
+    global store
+    global store_run_id
+    store = None
+    log_path = args.log_path
+    store_path = getattr(args, 'result_store', None)
+    if not store_path is None:
+        log_path = os.path.join(args.log_path, spec.xray_id, 
+                datetime.now().strftime('%Y%m%d_%H%M%S_%f'))
+        store = result_store(file_path=store_path)
+
+    global warm_start
+    global dut_state_path
+    global dut_powered
+    global expected_parameters
+    warm_start = getattr(args, 'warm_start', False)
+    dut_powered = True
+    dut_state_path = getattr(args, 'dut_state', None)
+    if dut_state_path is None:
+        dut_state_path = f'{args.log_path}/{args.serial}.dut_state.json'
+    expected_parameters = None
+    expected_parameters_path = getattr(args, 'expected_parameters', None)
+    if not expected_parameters_path is None:
+        with open(expected_parameters_path, 'r', encoding='utf-8') as file:
+            expected_parameters = json.loads(file.read())
+    calibrated_signals.clear()
+
+    global differential_parameters
+    differential_parameters = getattr(args, 'differential_parameters', False)
+    known_parameters.clear()
+
+    global reference_period_ms
+    reference_period_ms = getattr(args, 'reference_period_ms', 
+            default_reference_period_ms)
+
+    global metrics
+    metrics_format = runtime_metrics_format(getattr(args, 'metrics_format', 
+            runtime_metrics_format.JSON_LINES.value))
+    metrics_path = f'{log_path}/{spec.xray_id}.metrics.{metrics_format.value}'
+    profile_path = f'{log_path}/{spec.xray_id}.profile.json'
+    metrics = runtime_metrics(file_path=metrics_path, format=metrics_format)
 
     adapter = None
+    sim_spec: Dict[str, Any] = {}
     try:
         if args.adapter == adapter_type.COMM.value:
             adapter = comm_adapter(ip=args.adapter_path)
+        elif args.adapter == sim_adapter_type.SIM.value:
+            if not args.adapter_path is None:
+                with open(args.adapter_path, 'r', encoding='utf-8') as file:
+                    sim_spec = json.loads(file.read())
+            adapter = sim_adapter.create_from_spec(spec=sim_spec)
         elif args.adapter == adapter_type.DTLv01.value:
             raise Exception('DTLv01 is not supported')
         elif args.adapter == adapter_type.DTLv02.value:
@@ -322,7 +1025,11 @@ def run_test_spec(args: argparse.Namespace) -> None:
 
     dut = None
     try:
-        dut = dut_adapter(serial_number=args.serial, adapter=adapter)
+        if isinstance(adapter, sim_adapter):
+            dut = sim_dut_adapter.create_from_spec(serial_number=args.serial, 
+                    adapter=adapter, spec=sim_spec.get('dut', {}))
+        else:
+            dut = dut_adapter(serial_number=args.serial, adapter=adapter)
     except:
         raise Exception(f'Failed to connect to the DUT')
 
@@ -331,17 +1038,33 @@ def run_test_spec(args: argparse.Namespace) -> None:
     e2e_gateway = None
     if not args.e2e_gateway is None:
         try:
-            e2e_gateway = dut_adapter(serial_number=args.e2e_gateway, 
-                    adapter=adapter)
+            if isinstance(adapter, sim_adapter):
+                e2e_gateway = sim_dut_adapter.create_from_spec(
+                        serial_number=args.e2e_gateway, adapter=adapter, 
+                        spec=sim_spec.get('e2e_gateway', {}))
+            else:
+                e2e_gateway = dut_adapter(serial_number=args.e2e_gateway, 
+                        adapter=adapter)
         except:
             raise Exception(f'Failed to connect to the E2E gateway')
 
+    if not os.path.exists(log_path):
+        os.makedirs(log_path)
+
+    if not store is None:
+        store_run_id = store.start_run(xray_id=spec.xray_id, name=spec.name, 
+                dut_serial=args.serial, log_path=os.path.abspath(log_path), 
+                log_file=f'{spec.xray_id}.log', csv_file=f'{spec.xray_id}.csv', 
+                metrics_file=os.path.basename(metrics_path), 
+                profile_file=os.path.basename(profile_path) 
+                        if profiler.enabled else None)
+
     try:
         test_scenario_thread = threading.Thread(target=start_test_scenario_thread, 
-                args=[adapter, dut, spec, dbc_paths, args.log_path, e2e_protection, 
-                        e2e_gateway])
+                args=[adapter, dut, spec, initial_plan, plans, dbc_paths, 
+                        log_path, e2e_protection, e2e_gateway])
         monitoring_thread = threading.Thread(target=monitoring_thread_handle, 
-                args=[spec, args.log_path])
+                args=[spec, log_path])
         test_scenario_thread.start()
         monitoring_thread.start()
     except:
@@ -361,5 +1084,13 @@ def run_test_spec(args: argparse.Namespace) -> None:
         monitoring_thread.join()
     finish_event.clear()
     error_event.clear()
+    monitoring_start_event.clear()
+    profiler.write_report(file_path=profile_path)
+    if not store is None:
+        if status == False:
+            store.finish_run(run_id=store_run_id, status=False)
+        store.close()
     if status == False:
+        if not scenario_error is None:
+            raise Exception(f'PIL framework error occurred: {scenario_error}')
         raise Exception('PIL framework error occurred')
\ No newline at end of file
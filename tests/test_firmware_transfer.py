@@ -0,0 +1,83 @@
+from typing import Dict, List
+import asyncio
+import hashlib
+import sys
+import os
+
+root_path = os.path.dirname(os.path.dirname(__file__))
+if not root_path in sys.path:
+    sys.path.append(root_path)
+
+from common.tools.firmware_transfer import firmware_transfer
+
+class fake_dut:
+    def __init__(self, errors: Dict[int, List[Exception]] = {}) -> None:
+        self.errors: Dict[int, List[Exception]] = \
+                {offset: list(errors[offset]) for offset in errors}
+        self.attempts: Dict[int, int] = {}
+        self.image: bytearray = None
+        self.sha256: str = None
+
+    async def start_firmware_update(self, size: int, block_size: int) -> None:
+        self.image = bytearray(size)
+
+    async def write_firmware_block(self, offset: int, data: bytes) -> bool:
+        self.attempts[offset] = self.attempts.get(offset, 0) + 1
+        if len(self.errors.get(offset, [])) > 0:
+            error = self.errors[offset].pop(0)
+            if error is None:
+                return False
+            raise error
+        self.image[offset:offset + len(data)] = data
+        return True
+
+    async def finish_firmware_update(self, sha256: str) -> None:
+        self.sha256 = sha256
+
+def prepare_image(tmp_path) -> bytes:
+    image = bytes(index % 251 for index in range(5000))
+    (tmp_path / 'firmware.bin').write_bytes(image)
+    return image
+
+def run_transfer(tmp_path, dut: fake_dut, retries: int = 2):
+    return asyncio.run(firmware_transfer(dut=dut,
+            image_path=str(tmp_path / 'firmware.bin'), block_size=1024,
+            window=4, retries=retries).run())
+
+def test_failed_blocks_are_retried(tmp_path):
+    image = prepare_image(tmp_path=tmp_path)
+    dut = fake_dut(errors={1024: [None, TimeoutError('bus timeout')],
+            4096: [ConnectionError('bus off')]})
+    report = run_transfer(tmp_path=tmp_path, dut=dut)
+    assert bytes(dut.image) == image
+    assert dut.sha256 == hashlib.sha256(image).hexdigest()
+    assert dut.attempts[1024] == 3
+    assert dut.attempts[4096] == 2
+    assert dut.attempts[0] == 1
+    assert report.retried_blocks == 3
+
+def test_failure_reports_the_last_cause(tmp_path):
+    prepare_image(tmp_path=tmp_path)
+    dut = fake_dut(errors={2048: [TimeoutError('bus timeout')] * 3})
+    try:
+        run_transfer(tmp_path=tmp_path, dut=dut)
+    except Exception as e:
+        assert '1 blocks were not accepted after 2 retries' in str(e)
+        assert 'TimeoutError: bus timeout' in str(e)
+        assert isinstance(e.__cause__, TimeoutError)
+    else:
+        assert False, 'failed transfer is not reported'
+    assert dut.attempts[2048] == 3
+    assert dut.sha256 is None
+
+def test_other_errors_are_not_retried(tmp_path):
+    prepare_image(tmp_path=tmp_path)
+    dut = fake_dut(errors={0: [ValueError('wrong block')]})
+    try:
+        run_transfer(tmp_path=tmp_path, dut=dut)
+    except ValueError as e:
+        assert str(e) == 'wrong block'
+    else:
+        assert False, 'adapter error is not raised'
+    assert dut.attempts[0] == 1
+    assert dut.sha256 is None
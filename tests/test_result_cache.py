@@ -0,0 +1,69 @@
+import subprocess
+import hashlib
+import json
+import sys
+import os
+
+root_path = os.path.dirname(os.path.dirname(__file__))
+if not root_path in sys.path:
+    sys.path.append(root_path)
+
+from benchmarks.generators import (generate_dbc_messages_spec,
+        generate_a2l_signals_spec, generate_test_spec_signals,
+        generate_test_spec)
+from common.structures.a2l_file import a2l_signal
+from common.structures.test_spec import test_spec
+from common.tools.result_cache import result_cache
+
+def prepare_key(source: str, upper_limit: str = '100') -> str:
+    a2l_spec = generate_a2l_signals_spec(signals=5)
+    signals = generate_test_spec_signals(
+            dbc_spec=generate_dbc_messages_spec(messages=5,
+                    signals_per_message=4),
+            a2l_spec=a2l_spec)
+    for name in signals:
+        signals[name].source = source
+    spec = test_spec.create_from_spec(spec=generate_test_spec(signals=signals,
+            steps=10, signals_per_step=3), signals=signals)
+    definitions = []
+    for name in sorted(a2l_spec):
+        definition = a2l_signal.create_from_spec(spec=a2l_spec[name],
+                source=source)
+        definition.upper_limit = upper_limit
+        definitions.append(definition)
+    return result_cache.prepare_key(spec_hash=spec.calculate_hash(),
+            definitions_hash=result_cache.calculate_definitions_hash(
+                    definitions=definitions),
+            dut_info='SN1 1.0.0')
+
+def test_key_does_not_depend_on_source_paths():
+    assert prepare_key(source='/a/bench.a2l') == \
+            prepare_key(source='/b/other.a2l')
+
+def test_key_depends_on_definitions():
+    assert prepare_key(source='bench.a2l') != \
+            prepare_key(source='bench.a2l', upper_limit='200')
+
+def test_key_is_stable_across_runs():
+    script = ('import sys; sys.path.insert(0, sys.argv[1]); ' +
+            'from test_result_cache import prepare_key; ' +
+            'print(prepare_key(source="bench.a2l"))')
+    keys = set()
+    for seed in ['1', '2']:
+        keys.add(subprocess.run([sys.executable, '-c', script,
+                os.path.dirname(__file__)], check=True, capture_output=True,
+                text=True, env={**os.environ, 'PYTHONHASHSEED': seed}
+                ).stdout.strip())
+    assert keys == {prepare_key(source='bench.a2l')}
+
+def test_stored_result_is_reused(tmp_path):
+    cache_path = str(tmp_path / 'cache' / 'results.json')
+    key = hashlib.sha256(b'key').hexdigest()
+    result_cache(file_path=cache_path).store(xray_id='BENCH-1', key=key,
+            status=True)
+    cache = result_cache(file_path=cache_path)
+    assert cache.is_passed(xray_id='BENCH-1', key=key)
+    assert not cache.is_passed(xray_id='BENCH-1', key='other')
+    assert not cache.is_passed(xray_id='BENCH-2', key=key)
+    with open(cache_path, 'r', encoding='utf-8') as file:
+        assert json.loads(file.read())['BENCH-1']['status'] == True
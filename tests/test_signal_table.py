@@ -0,0 +1,77 @@
+from array import array
+import sys
+import os
+
+root_path = os.path.dirname(os.path.dirname(__file__))
+if not root_path in sys.path:
+    sys.path.append(root_path)
+
+from common.structures.signal_table import (signal_table,
+        signal_table_cache_size)
+
+timestamps_ms = [-5.0, 0.0, 2.5, 10.0, 10.0, 12.5, 20.0, 20.0, 25.0, 30.0,
+        40.0, 7.5, 0.0, 35.0]
+
+def check_agreement(table: signal_table) -> None:
+    expected = [table.interpolate(timestamp_ms=timestamp_ms)
+            for timestamp_ms in timestamps_ms]
+    assert table.interpolate_many(timestamps_ms=timestamps_ms) == expected
+
+def test_interpolation_agrees():
+    table = signal_table(times_ms=[0.0, 10.0, 20.0, 30.0],
+            values=[0.0, 5.0, -5.0, 1.0])
+    check_agreement(table=table)
+    assert table.interpolate(timestamp_ms=-5.0) == 0.0
+    assert table.interpolate(timestamp_ms=25.0) == -2.0
+    assert table.interpolate(timestamp_ms=40.0) == 1.0
+
+def test_interpolation_agrees_on_duplicate_breakpoints():
+    table = signal_table(times_ms=[0.0, 10.0, 10.0, 10.0, 20.0, 20.0],
+            values=[0.0, 1.0, 2.0, 3.0, 4.0, 8.0])
+    check_agreement(table=table)
+    assert table.interpolate(timestamp_ms=10.0) == 3.0
+    assert table.interpolate(timestamp_ms=20.0) == 8.0
+    assert table.interpolate_many(timestamps_ms=[9.0, 10.0, 15.0]) == \
+            [0.9, 3.0, 3.5]
+
+def test_interpolation_agrees_on_single_breakpoint():
+    check_agreement(table=signal_table(times_ms=[10.0], values=[7.0]))
+
+def test_profiles_are_loaded_next_to_the_spec(tmp_path):
+    (tmp_path / 'profile.csv').write_text('time_ms,value\n0,0\n10,5\n',
+            encoding='utf-8')
+    points = array('d', [0.0, 0.0, 10.0, 5.0])
+    if sys.byteorder != 'little':
+        points.byteswap()
+    (tmp_path / 'profile.bin').write_bytes(points.tobytes())
+    for name in ['profile.csv', 'profile.bin']:
+        table = signal_table.create_from_coef(coef=[name],
+                base_path=str(tmp_path))
+        assert table.source == os.path.join(str(tmp_path), name)
+        assert table.interpolate(timestamp_ms=4.0) == 2.0
+
+def test_profile_cache_is_bounded(tmp_path):
+    for index in range(signal_table_cache_size + 1):
+        (tmp_path / f'{index}.csv').write_text(f'0,{index}\n',
+                encoding='utf-8')
+    first = signal_table.load(file_path=str(tmp_path / '0.csv'))
+    assert signal_table.load(file_path=str(tmp_path / '0.csv')) is first
+    for index in range(1, signal_table_cache_size + 1):
+        signal_table.load(file_path=str(tmp_path / f'{index}.csv'))
+    reloaded = signal_table.load(file_path=str(tmp_path / '0.csv'))
+    assert not reloaded is first
+    assert reloaded.values == first.values
+
+def test_table_from_coef():
+    table = signal_table.create_from_coef(coef=[[0, 1], [10, 3]])
+    assert table.interpolate(timestamp_ms=5.0) == 2.0
+    assert table.calculate_hash() == signal_table(times_ms=[0.0, 10.0],
+            values=[1.0, 3.0]).calculate_hash()
+
+def test_unsorted_breakpoints_are_rejected():
+    try:
+        signal_table(times_ms=[0.0, 10.0, 5.0], values=[0.0, 1.0, 2.0])
+    except Exception as e:
+        assert 'not sorted' in str(e)
+    else:
+        assert False, 'unsorted breakpoints are accepted'
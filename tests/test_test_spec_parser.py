@@ -0,0 +1,57 @@
+import json
+import sys
+import os
+
+root_path = os.path.dirname(os.path.dirname(__file__))
+if not root_path in sys.path:
+    sys.path.append(root_path)
+
+from benchmarks.generators import (generate_dbc_messages_spec,
+        generate_a2l_signals_spec, generate_test_spec_signals,
+        generate_test_spec)
+from common.parsers.test_spec_parser import test_spec_parser
+from common.structures.test_spec import test_spec, step_type
+
+def prepare_spec(tmp_path, steps: int = 120):
+    signals = generate_test_spec_signals(
+            dbc_spec=generate_dbc_messages_spec(messages=10,
+                    signals_per_message=4),
+            a2l_spec=generate_a2l_signals_spec(signals=5))
+    spec_json = generate_test_spec(signals=signals, steps=steps,
+            signals_per_step=3)
+    spec_path = tmp_path / 'spec.json'
+    spec_path.write_text(json.dumps(spec_json, indent=4), encoding='utf-8')
+    return str(spec_path), spec_json, signals
+
+def test_lazy_and_eager_specs_are_equal(tmp_path):
+    spec_path, spec_json, signals = prepare_spec(tmp_path=tmp_path)
+    eager = test_spec.create_from_spec(spec=spec_json, signals=signals,
+            base_path=str(tmp_path))
+    header = test_spec_parser.parse_header(spec_path=spec_path)
+    lazy = test_spec_parser.create_test_spec(header=header, signals=signals)
+    assert len(lazy.steps) == len(eager.steps)
+    assert lazy.base_path == eager.base_path
+    assert lazy.to_dict() == eager.to_dict()
+    assert lazy.calculate_hash() == eager.calculate_hash()
+
+def test_lazy_steps_can_be_iterated_again(tmp_path):
+    spec_path, _, signals = prepare_spec(tmp_path=tmp_path, steps=60)
+    lazy = test_spec_parser.create_test_spec(
+            header=test_spec_parser.parse_header(spec_path=spec_path),
+            signals=signals)
+    first = [step.action for step in lazy.steps]
+    second = [step.action for step in lazy.steps]
+    assert first == second
+    assert any(step.type == step_type.SPECIAL for step in lazy.steps)
+
+def test_lazy_parser_reports_missing_step_signal(tmp_path):
+    spec_path, _, signals = prepare_spec(tmp_path=tmp_path, steps=3)
+    header = test_spec_parser.parse_header(spec_path=spec_path)
+    missing = next(iter(header.step_signals))
+    signals.pop(missing)
+    try:
+        test_spec_parser.create_test_spec(header=header, signals=signals)
+    except Exception as e:
+        assert missing in str(e)
+    else:
+        assert False, 'missing signal is not reported'